@@ -1,8 +1,12 @@
 from setuptools import Extension, setup
+import sys
 import numpy
 
 np_defines = [("NPY_NO_DEPRECATED_API", "NPY_1_7_API_VERSION")]
 np_includes = [numpy.get_include()]
+# prange loops fall back to serial execution without OpenMP, which
+# isn't available from the default compiler on macOS or Windows
+openmp_args = ["-fopenmp"] if sys.platform.startswith("linux") else []
 
 extension_modules = [
     Extension(
@@ -10,6 +14,8 @@ extension_modules = [
         sources=["src/chmpy/interpolate/_density.pyx"],
         define_macros=np_defines,
         include_dirs=np_includes,
+        extra_compile_args=openmp_args,
+        extra_link_args=openmp_args,
     ),
     Extension(
         "chmpy.shape._invariants",
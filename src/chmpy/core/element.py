@@ -1,13 +1,10 @@
 """Module for static information about chemical elements."""
 
-import re
-import functools
 from collections import Counter
 import numbers
+from string import ascii_letters
 import numpy as np
 
-_SYMBOL_REGEX = re.compile("([A-Z]+).*", re.IGNORECASE)
-
 
 _ELEMENT_DATA = (
     # name symbol cov vdw mass
@@ -116,15 +113,15 @@ _ELEMENT_DATA = (
     ("lawrencium", "Lr", 1.50, 2.00, 262.0),
 )
 
-_EL_FROM_SYM = {
-    s: (i, n, s, rcov, rvdw, m)
-    for i, (n, s, rcov, rvdw, m) in enumerate(_ELEMENT_DATA, start=1)
-}
+# atomic numbers keyed by symbol and by name
+_EL_FROM_SYM = {s: i for i, (n, s, *_) in enumerate(_ELEMENT_DATA, start=1)}
+
+# per-element property arrays, indexed by atomic number - 1
+_COVALENT_RADII = np.array([x[2] for x in _ELEMENT_DATA])
+_VDW_RADII = np.array([x[3] for x in _ELEMENT_DATA])
+_MASSES = np.array([x[4] for x in _ELEMENT_DATA])
 
-_EL_FROM_NAME = {
-    n: (i, n, s, rcov, rvdw, m)
-    for i, (n, s, rcov, rvdw, m) in enumerate(_ELEMENT_DATA, start=1)
-}
+_EL_FROM_NAME = {n: i for i, (n, s, *_) in enumerate(_ELEMENT_DATA, start=1)}
 
 _EL_COLORS = (
     (255, 255, 255, 255),
@@ -249,7 +246,6 @@ class _ElementMeta(type):
             raise ValueError("cannot construct element from provided type")
 
 
-@functools.total_ordering
 class Element(metaclass=_ElementMeta):
     """Storage class for information about a chemical element.
 
@@ -267,6 +263,8 @@ class Element(metaclass=_ElementMeta):
         [C, H, N, F, F]
     """
 
+    __slots__ = ("atomic_number", "name", "symbol", "cov", "vdw", "mass")
+
     def __init__(self, atomic_number, name, symbol, cov, vdw, mass):
         """Initialize an Element from its chemical data."""
         self.atomic_number = atomic_number
@@ -304,8 +302,8 @@ class Element(metaclass=_ElementMeta):
             if name not in _EL_FROM_NAME:
                 return Element.from_label(s)
             else:
-                return Element(*_EL_FROM_NAME[name])
-        return Element(*_EL_FROM_SYM[symbol])
+                return _ELEMENTS[_EL_FROM_NAME[name] - 1]
+        return _ELEMENTS[_EL_FROM_SYM[symbol] - 1]
 
     @staticmethod
     def from_label(label: str) -> "Element":
@@ -329,13 +327,11 @@ class Element(metaclass=_ElementMeta):
             >>> Element.from_label("Ca2_F2____1____i")
             Ca
         """
-        m = re.match(_SYMBOL_REGEX, label)
-        if m is None:
-            raise ValueError("Could not determine symbol from {}".format(label))
-        sym = m.group(1).strip().capitalize()
+        # the symbol is the leading run of letters
+        sym = label[: len(label) - len(label.lstrip(ascii_letters))].capitalize()
         if sym not in _EL_FROM_SYM:
             raise ValueError("Could not determine symbol from {}".format(label))
-        return Element(*_EL_FROM_SYM[sym])
+        return _ELEMENTS[_EL_FROM_SYM[sym] - 1]
 
     @staticmethod
     def from_atomic_number(n: int) -> "Element":
@@ -353,7 +349,7 @@ class Element(metaclass=_ElementMeta):
             >>> Element[79].name
             'gold'
         """
-        return Element(n, *_ELEMENT_DATA[n - 1])
+        return _ELEMENTS[n - 1]
 
     @property
     def vdw_radius(self) -> float:
@@ -385,28 +381,52 @@ class Element(metaclass=_ElementMeta):
         """Hash of this element (its atomic number)."""
         return int(self.atomic_number)
 
-    def _is_valid_operand(self, other):
-        return hasattr(other, "atomic_number")
-
     def __eq__(self, other):
         """Check if two Elements have the same atomic number."""
-        if not self._is_valid_operand(other):
-            raise NotImplementedError
-        return self.atomic_number == other.atomic_number
+        return self.atomic_number == _operand_atomic_number(other)
 
     def __lt__(self, other):
         """Check which element comes before the other in chemical formulae (C first, then order of atomic number)."""
-        if not self._is_valid_operand(other):
-            raise NotImplementedError
-        n1, n2 = self.atomic_number, other.atomic_number
-        if n1 == n2:
-            return False
-        if n1 == 6:
-            return True
-        elif n2 == 6:
-            return False
-        else:
-            return n1 < n2
+        return _formula_precedes(self.atomic_number, _operand_atomic_number(other))
+
+    def __le__(self, other):
+        """Check if this element comes before, or is the same as, the other in chemical formulae."""
+        n1, n2 = self.atomic_number, _operand_atomic_number(other)
+        return n1 == n2 or _formula_precedes(n1, n2)
+
+    def __gt__(self, other):
+        """Check if this element comes after the other in chemical formulae."""
+        return _formula_precedes(_operand_atomic_number(other), self.atomic_number)
+
+    def __ge__(self, other):
+        """Check if this element comes after, or is the same as, the other in chemical formulae."""
+        n1, n2 = self.atomic_number, _operand_atomic_number(other)
+        return n1 == n2 or _formula_precedes(n2, n1)
+
+
+def _operand_atomic_number(other):
+    n = getattr(other, "atomic_number", None)
+    if n is None:
+        raise NotImplementedError
+    return n
+
+
+def _formula_precedes(n1, n2):
+    "True if atomic number n1 comes before n2 in formulae (C first, then by atomic number)"
+    if n1 == 6:
+        return n2 != 6
+    return n2 != 6 and n1 < n2
+
+
+# shared instances, one per element, returned by the Element.from_* methods
+_ELEMENTS = tuple(
+    Element(i, *row) for i, row in enumerate(_ELEMENT_DATA, start=1)
+)
+
+# translation table from digits to unicode subscript digits
+_SUBSCRIPT_DIGITS = str.maketrans(
+    "0123456789", "".join(chr(0x2080 + i) for i in range(10))
+)
 
 
 def chemical_formula(elements, subscript=False):
@@ -427,15 +447,16 @@ def chemical_formula(elements, subscript=False):
     Returns:
         str: the chemical formula
     """
-    count = Counter(sorted(elements))
+    # count first, then only the unique elements need sorting
+    count = sorted(Counter(elements).items(), key=lambda x: x[0])
     if subscript:
         blocks = []
-        for el, c in count.items():
-            c = "".join(chr(0x2080 + int(i)) for i in str(c)) if c > 1 else ""
+        for el, c in count:
+            c = str(c).translate(_SUBSCRIPT_DIGITS) if c > 1 else ""
             blocks.append(f"{el}{c}")
     else:
         blocks = []
-        for el, c in count.items():
+        for el, c in count:
             c = c if c > 1 else ""
             blocks.append(f"{el}{c}")
     return "".join(blocks)
@@ -450,9 +471,10 @@ def cov_radii(atomic_numbers):
     Returns:
         np.ndarray: (N,) array of floats representing covalent radii
     """
+    atomic_numbers = np.asarray(atomic_numbers)
     if np.any(atomic_numbers < 1) or np.any(atomic_numbers > 103):
         raise ValueError("All elements must be atomic numbers between [1,103]")
-    return np.array([_ELEMENT_DATA[i - 1][2] for i in atomic_numbers], dtype=np.float32)
+    return _COVALENT_RADII[atomic_numbers - 1].astype(np.float32)
 
 
 def vdw_radii(atomic_numbers):
@@ -464,9 +486,25 @@ def vdw_radii(atomic_numbers):
     Returns:
         np.ndarray: (N,) array of floats representing van der Waals radii
     """
+    atomic_numbers = np.asarray(atomic_numbers)
+    if np.any(atomic_numbers < 1) or np.any(atomic_numbers > 103):
+        raise ValueError("All elements must be atomic numbers between [1,103]")
+    return _VDW_RADII[atomic_numbers - 1].astype(np.float32)
+
+
+def atomic_masses(atomic_numbers):
+    """Return the atomic masses for the given atomic numbers.
+
+    Args:
+        atomic_numbers (array_like): the (N,) length integer array of atomic numbers
+
+    Returns:
+        np.ndarray: (N,) array of floats representing atomic masses
+    """
+    atomic_numbers = np.asarray(atomic_numbers)
     if np.any(atomic_numbers < 1) or np.any(atomic_numbers > 103):
         raise ValueError("All elements must be atomic numbers between [1,103]")
-    return np.array([_ELEMENT_DATA[i - 1][3] for i in atomic_numbers], dtype=np.float32)
+    return _MASSES[atomic_numbers - 1]
 
 
 def element_names(atomic_numbers):
@@ -2,7 +2,7 @@ import logging
 from collections import defaultdict
 from scipy.spatial import cKDTree as KDTree
 from scipy.spatial.distance import cdist
-from scipy.sparse import dok_matrix
+from scipy.sparse import dok_matrix, coo_matrix
 from pathlib import Path
 import numpy as np
 from .element import Element
@@ -114,15 +114,17 @@ class Molecule:
         tree = KDTree(self.positions)
         covalent_radii = np.array([x.cov for x in self.elements])
         max_cov = np.max(covalent_radii)
-        thresholds = (
-            covalent_radii[:, np.newaxis] + covalent_radii[np.newaxis, :] + tolerance
-        )
         max_distance = max_cov * 2 + tolerance
-        dist = tree.sparse_distance_matrix(tree, max_distance=max_distance).toarray()
-        mask = (dist > 0) & (dist < thresholds)
-        self.bonds = np.zeros(dist.shape)
-        self.bonds[mask] = dist[mask]
-        self.bonds = dok_matrix(self.bonds)
+        pairs = tree.query_pairs(r=max_distance, output_type="ndarray")
+        i, j = pairs[:, 0], pairs[:, 1]
+        dist = np.linalg.norm(self.positions[i] - self.positions[j], axis=1)
+        mask = (dist > 0) & (dist < covalent_radii[i] + covalent_radii[j] + tolerance)
+        i, j, dist = i[mask], j[mask], dist[mask]
+        n = len(self.positions)
+        self.bonds = coo_matrix(
+            (np.hstack((dist, dist)), (np.hstack((i, j)), np.hstack((j, i)))),
+            shape=(n, n),
+        ).todok()
         try:
             self.bond_graph()
         except Exception:
@@ -772,9 +774,12 @@ class Molecule:
 
         from chmpy import StockholderWeight
         from chmpy.surface import stockholder_weight_isosurface
-        from matplotlib.cm import get_cmap
         import trimesh
-        from chmpy.util.color import DEFAULT_COLORMAPS
+        from chmpy.util.color import (
+            DEFAULT_COLORMAPS,
+            get_colormap,
+            two_slope_normalize,
+        )
 
         sep = kwargs.get("separation", kwargs.get("resolution", 0.2))
         radius = kwargs.get("radius", 12.0)
@@ -783,7 +788,7 @@ class Molecule:
         isovalue = kwargs.get("isovalue", 0.5)
         midpoint = kwargs.get("midpoint", 0.0 if vertex_color == "d_norm" else None)
         meshes = []
-        colormap = get_cmap(
+        colormap = get_colormap(
             kwargs.get("colormap", DEFAULT_COLORMAPS.get(vertex_color, "viridis_r"))
         )
         isos = []
@@ -805,12 +810,8 @@ class Molecule:
             isos.append(iso)
         for iso in isos:
             prop = iso.vertex_prop[vertex_color]
-            norm = None
             if midpoint is not None:
-                from matplotlib.colors import DivergingNorm
-
-                norm = DivergingNorm(vmin=prop.min(), vcenter=midpoint, vmax=prop.max())
-                prop = norm(prop)
+                prop = two_slope_normalize(prop, prop.min(), midpoint, prop.max())
             color = colormap(prop)
             mesh = trimesh.Trimesh(
                 vertices=iso.vertices,
@@ -1,5 +1,4 @@
 import logging
-from collections import defaultdict
 import numpy as np
 from chmpy.core.element import Element, chemical_formula
 
@@ -33,16 +32,28 @@ class AsymmetricUnit:
 
         """
         self.elements = elements
-        self.atomic_numbers = np.asarray([x.atomic_number for x in elements])
+        self.atomic_numbers = np.asarray(
+            [x.atomic_number for x in elements], dtype=np.int16
+        )
         self.positions = np.asarray(positions)
         self.properties = {}
         self.properties.update(kwargs)
-        if labels is None:
+        if labels is None and len(elements) > 0:
+            # number sites sequentially per element e.g. C1, H1, C2, ...
+            uniq, first, inv = np.unique(
+                self.atomic_numbers, return_index=True, return_inverse=True
+            )
+            counts = np.bincount(inv)
+            order = np.argsort(inv, kind="stable")
+            index = np.empty(len(inv), dtype=np.int64)
+            index[order] = np.arange(1, len(inv) + 1) - np.repeat(
+                np.cumsum(counts) - counts, counts
+            )
+            symbols = np.array([str(elements[i]) for i in first])
+            digits = len(str(index.max()))
+            self.labels = np.char.add(symbols[inv], index.astype(f"U{digits}"))
+        elif labels is None:
             self.labels = []
-            label_index = defaultdict(int)
-            for el in self.elements:
-                label_index[el] += 1
-                self.labels.append("{}{}".format(el, label_index[el]))
         else:
             self.labels = labels
         self.labels = np.array(self.labels)
@@ -1,14 +1,16 @@
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from scipy.spatial import cKDTree as KDTree
 import numpy as np
-from scipy.sparse import dok_matrix
+from scipy.sparse import coo_matrix
 import scipy.sparse.csgraph as csgraph
 from pathlib import Path
 from chmpy.fmt.cif import Cif
 from .unit_cell import UnitCell
 from .space_group import SpaceGroup, SymmetryOperation
+from .symmetry_operation import IDENTITY_SYMOP_CODE
 from .asymmetric_unit import AsymmetricUnit
-from chmpy.core.element import Element
+from chmpy.core.element import Element, atomic_masses, cov_radii, element_symbols
 from chmpy.core.molecule import Molecule
 from chmpy.util.num import cartesian_product
 from typing import List, Tuple, Union, Dict
@@ -16,6 +18,13 @@ from trimesh import Trimesh
 
 LOG = logging.getLogger(__name__)
 
+def _descriptor_bounds(positions, origin):
+    """Radial bounds for the shape descriptor root finding, from half the
+    nearest to 10 angstroms beyond the furthest of `positions` from `origin`."""
+    diff = positions - origin
+    d2 = np.einsum("ij,ij->i", diff, diff)
+    return np.sqrt(d2.min()) / 2, np.sqrt(d2.max()) + 10.0
+
 
 def _nearest_molecule_idx(vertices, el, pos):
     from scipy.sparse.csgraph import connected_components
@@ -27,7 +36,7 @@ def _nearest_molecule_idx(vertices, el, pos):
     m.guess_bonds()
     nfrag, labels = connected_components(m.bonds)
     tree = KDTree(pos)
-    d, idxs = tree.query(vertices, k=1)
+    d, idxs = tree.query(vertices, k=1, workers=-1)
     t2 = time()
     l = labels[idxs]
     u, idxs = np.unique(l, return_inverse=True)
@@ -40,10 +49,32 @@ def _nearest_atom_idx(vertices, el, pos):
 
     t1 = time()
     tree = KDTree(pos)
-    d, idxs = tree.query(vertices, k=1)
+    d, idxs = tree.query(vertices, k=1, workers=-1)
     t2 = time()
     return idxs
 
+
+def _bond_filter(pos_a, pos_b, thresholds):
+    """Mask of the corresponding rows of `pos_a` and `pos_b` closer than
+    `thresholds` (excluding coincident sites), and the distances between
+    those rows. Comparisons are done on squared distances."""
+    diff = pos_a - pos_b
+    d2 = np.einsum("ij,ij->i", diff, diff)
+    keep = (d2 > 1e-6) & (d2 < thresholds * thresholds)
+    return keep, np.sqrt(d2[keep])
+
+
+def _environment_mask(tree, npoints, positions, radius, threshold):
+    """Mask of the `npoints` tree sites within `radius` of any of `positions`,
+    excluding those sites within `threshold` of one of `positions`."""
+    keep = np.zeros(npoints, dtype=bool)
+    idxs = tree.query_ball_point(positions, radius)
+    keep[np.concatenate(idxs).astype(np.intp)] = True
+    d, nn = tree.query(positions)
+    keep[nn[d < threshold]] = False
+    return keep
+
+
 class Crystal:
     """
     Storage class for a molecular crystal structure.
@@ -128,6 +159,25 @@ class Crystal:
         "Symmetry operations belonging to the space group symmetry of this crystal."
         return self.space_group.symmetry_operations
 
+    @property
+    def cart_asymmetric_unit(self) -> np.ndarray:
+        "Cartesian positions of the asymmetric unit sites"
+        return self.to_cartesian(self.asymmetric_unit.positions)
+
+    def _clear_slab_cache(self):
+        "Discard cached slabs, needed when the unit cell or sites change"
+        for attr in ("_slab_cache", "_slab_tree_cache"):
+            if hasattr(self, attr):
+                delattr(self, attr)
+
+    def _slab_bounds(self, frac_pos, radius) -> Tuple:
+        "hkl bounds of the slab containing all sites within radius of frac_pos"
+        frac_pos = np.atleast_2d(frac_pos)
+        frac_radius = radius * np.linalg.norm(self.unit_cell.inverse, axis=0)
+        hmax, kmax, lmax = np.ceil(frac_pos.max(axis=0) + frac_radius).astype(int)
+        hmin, kmin, lmin = np.floor(frac_pos.min(axis=0) - frac_radius).astype(int)
+        return ((hmin, kmin, lmin), (hmax, kmax, lmax))
+
     def to_cartesian(self, coords) -> np.ndarray:
         """
         Convert coordinates (row major) from fractional to cartesian coordinates.
@@ -204,18 +254,18 @@ class Crystal:
         uc_nums = np.tile(atoms, nsymops)
         asym = np.arange(len(uc_nums)) % natom
         sym, uc_pos = self.space_group.apply_all_symops(pos)
-        translated = np.fmod(uc_pos + 7.0, 1)
+        translated = uc_pos - np.floor(uc_pos)
+        # tiny negative coordinates round up to exactly 1.0
+        translated[translated >= 1.0] = 0.0
         tree = KDTree(translated)
-        dist = tree.sparse_distance_matrix(tree, max_distance=tolerance)
+        pairs = tree.query_pairs(r=tolerance, output_type="ndarray")
         mask = np.ones(len(uc_pos), dtype=bool)
         # because crystals may have partially occupied sites
         # on special positions, we need to merge some sites
         # expected_natoms = np.sum(occupation)
-        for (i, j), _ in dist.items():
-            if not (i < j):
-                continue
-            occupation[i] += occupation[j]
-            mask[j] = False
+        if len(pairs) > 0:
+            np.add.at(occupation, pairs[:, 0], occupation[pairs[:, 1]])
+            mask[pairs[:, 1]] = False
         occupation = occupation[mask]
         if np.any(occupation > 1.0):
             LOG.debug("Some unit cell site occupations are > 1.0")
@@ -258,7 +308,7 @@ class Crystal:
                 1 is typically sufficient for organic systems.
 
         Returns:
-            A tuple of (sparse_matrix in dict of keys format, dict)
+            A tuple of (sparse_matrix in compressed sparse row format, dict)
             the (i, j) value in this matrix is the bond length from i,j
             the (i, j) value in the dict is the cell translation on j which
             bonds these two sites
@@ -272,45 +322,70 @@ class Crystal:
         uc_nums = slab["element"][:n_uc]
         neighbour_pos = slab["frac_pos"][n_uc:]
         cart_uc_pos = self.to_cartesian(uc_pos)
-        covalent_radii_dict = {
-            x: Element.from_atomic_number(x).cov for x in np.unique(uc_nums)
-        }
-        covalent_radii_dict.update(kwargs.get("covalent_radii", {}))
+        covalent_radii = cov_radii(uc_nums).astype(np.float64)
+        for x, r in kwargs.get("covalent_radii", {}).items():
+            covalent_radii[uc_nums == x] = r
         # first establish all connections in the unit cell
-        covalent_radii = np.array([covalent_radii_dict[x] for x in uc_nums])
         max_cov = np.max(covalent_radii)
-        # TODO this needs to be sped up for large cells, tends to slow for > 1000 atoms
-        # and the space storage will become a problem
+        max_distance = 2 * max_cov + tolerance
         tree = KDTree(cart_uc_pos)
-        dist = tree.sparse_distance_matrix(tree, max_distance=2 * max_cov + tolerance)
-        uc_edges = []
-
-        for (i, j), d in dist.items():
-            if not (i < j):
-                continue
-            if d > 1e-3 and d < (covalent_radii[i] + covalent_radii[j] + tolerance):
-                uc_edges.append((i, j, d, (0, 0, 0)))
+        pairs = tree.query_pairs(r=max_distance, output_type="ndarray")
+        # (i, j, distance, cell) for each bond, with i < j
+        edges = [
+            (
+                np.empty(0, dtype=np.intp),
+                np.empty(0, dtype=np.intp),
+                np.empty(0),
+                np.empty((0, 3)),
+            )
+        ]
+        if len(pairs) > 0:
+            i, j = pairs[:, 0], pairs[:, 1]
+            keep, d = _bond_filter(
+                cart_uc_pos[i],
+                cart_uc_pos[j],
+                covalent_radii[i] + covalent_radii[j] + tolerance,
+            )
+            edges.append((i[keep], j[keep], d, np.zeros((len(d), 3))))
 
         cart_neighbour_pos = self.unit_cell.to_cartesian(neighbour_pos)
         tree2 = KDTree(cart_neighbour_pos)
-        dist = tree.sparse_distance_matrix(tree2, max_distance=2 * max_cov + tolerance)
-        # could be sped up if done outside python
-        cells = slab["cell"][n_uc:]
-        for (uc_atom, neighbour_atom), d in dist.items():
+        neighbours = tree.query_ball_tree(tree2, r=max_distance)
+        counts = np.fromiter((len(x) for x in neighbours), dtype=np.intp, count=n_uc)
+        if counts.sum() > 0:
+            cells = slab["cell"][n_uc:]
+            uc_atom = np.repeat(np.arange(n_uc), counts)
+            neighbour_atom = np.concatenate(neighbours).astype(np.intp)
             uc_idx = neighbour_atom % n_uc
-            if not (uc_atom < uc_idx):
-                continue
-            if d > 1e-3 and d < (
-                covalent_radii[uc_atom] + covalent_radii[uc_idx] + tolerance
-            ):
-                cell = cells[neighbour_atom]
-                uc_edges.append((uc_atom, uc_idx, d, tuple(cell)))
+            # only the lower index of each pair needs to be considered
+            lower = uc_atom < uc_idx
+            uc_atom = uc_atom[lower]
+            uc_idx = uc_idx[lower]
+            neighbour_atom = neighbour_atom[lower]
+            keep, d = _bond_filter(
+                cart_uc_pos[uc_atom],
+                cart_neighbour_pos[neighbour_atom],
+                covalent_radii[uc_atom] + covalent_radii[uc_idx] + tolerance,
+            )
+            edges.append(
+                (uc_atom[keep], uc_idx[keep], d, cells[neighbour_atom[keep]])
+            )
 
-        properties = {}
-        uc_graph = dok_matrix((n_uc, n_uc))
-        for i, j, d, cell in uc_edges:
-            uc_graph[i, j] = d
-            properties[(i, j)] = cell
+        rows, cols, dists, edge_cells = (np.concatenate(x) for x in zip(*edges))
+        # a pair bonded through more than one cell keeps the last bond found
+        _, last = np.unique((rows * n_uc + cols)[::-1], return_index=True)
+        last = len(rows) - 1 - last
+        rows, cols, dists, edge_cells = (
+            rows[last],
+            cols[last],
+            dists[last],
+            edge_cells[last],
+        )
+        uc_graph = coo_matrix((dists, (rows, cols)), shape=(n_uc, n_uc)).tocsr()
+        properties = {
+            (i, j): tuple(cell)
+            for i, j, cell in zip(rows.tolist(), cols.tolist(), edge_cells.tolist())
+        }
 
         setattr(self, "_uc_graph", (uc_graph, properties))
         return getattr(self, "_uc_graph")
@@ -344,42 +419,66 @@ class Crystal:
         uc_elements = uc_dict["element"]
         uc_asym = uc_dict["asym_atom"]
         uc_symop = uc_dict["symop"]
+        asym_labels = self.asymmetric_unit.labels
 
         molecules = []
 
         n_uc = len(uc_frac)
         LOG.debug("%d molecules in unit cell", n_uc_mols)
-        for i in range(n_uc_mols):
-            nodes = np.where(uc_mols == i)[0]
-            root = nodes[0]
-            elements = uc_elements[nodes]
-            shifts = np.zeros((n_uc, 3))
+        # edges sorted by (i * n_uc + j), i < j, alongside their cell translations
+        edge_keys = np.fromiter(
+            (i * n_uc + j for i, j in edge_cells.keys()),
+            dtype=np.int64,
+            count=len(edge_cells),
+        )
+        edge_shifts = np.array(list(edge_cells.values()), dtype=np.float64).reshape(
+            -1, 3
+        )
+        edge_order = np.argsort(edge_keys)
+        edge_keys = edge_keys[edge_order]
+        edge_shifts = edge_shifts[edge_order]
+
+        # spanning forest: the shift of each atom relative to its BFS parent
+        parent = np.arange(n_uc)
+        shifts = np.zeros((n_uc, 3))
+        mol_nodes = np.split(
+            np.argsort(uc_mols, kind="stable"),
+            np.cumsum(np.bincount(uc_mols, minlength=n_uc_mols))[:-1],
+        )
+        for nodes in mol_nodes:
             ordered, pred = csgraph.breadth_first_order(
-                csgraph=uc_graph, i_start=root, directed=False
+                csgraph=uc_graph, i_start=nodes[0], directed=False
             )
-            for j in ordered[1:]:
-                i = pred[j]
-                if j < i:
-                    shifts[j, :] = shifts[i, :] - edge_cells[(j, i)]
-                else:
-                    shifts[j, :] = shifts[i, :] + edge_cells[(i, j)]
-            positions = self.to_cartesian((uc_frac + shifts)[nodes])
+            children = ordered[1:]
+            parents = pred[children]
+            lo = np.minimum(children, parents)
+            hi = np.maximum(children, parents)
+            idx = np.searchsorted(edge_keys, lo * n_uc + hi)
+            sign = np.where(children < parents, -1.0, 1.0)[:, np.newaxis]
+            parent[children] = parents
+            shifts[children] = sign * edge_shifts[idx]
+
+        # accumulate shifts along the path to each root by pointer doubling
+        while np.any(parent[parent] != parent):
+            shifts += shifts[parent]
+            parent = parent[parent]
+
+        uc_cart = self.to_cartesian(uc_frac + shifts)
+        for nodes in mol_nodes:
+            nodes = nodes[np.argsort(uc_asym[nodes])]
             asym_atoms = uc_asym[nodes]
-            reorder = np.argsort(asym_atoms)
-            asym_atoms = asym_atoms[reorder]
             mol = Molecule.from_arrays(
-                elements=elements[reorder],
-                positions=positions[reorder],
+                elements=uc_elements[nodes],
+                positions=uc_cart[nodes],
                 guess_bonds=True,
-                unit_cell_atoms=np.array(nodes)[reorder],
+                unit_cell_atoms=nodes,
                 asymmetric_unit_atoms=asym_atoms,
-                asymmetric_unit_labels=self.asymmetric_unit.labels[asym_atoms],
-                generator_symop=uc_symop[np.asarray(nodes)[reorder]],
+                asymmetric_unit_labels=asym_labels[asym_atoms],
+                generator_symop=uc_symop[nodes],
             )
             centroid = mol.center_of_mass
             frac_centroid = self.to_fractional(centroid)
-            new_centroid = np.fmod(frac_centroid + 7.0, 1.0)
-            translation = self.to_cartesian(new_centroid - frac_centroid)
+            translation = self.to_cartesian(-np.floor(frac_centroid))
             mol.translate(translation)
             molecules.append(mol)
         setattr(self, "_unit_cell_molecules", molecules)
@@ -469,7 +568,10 @@ class Crystal:
 
         # sort by % of identity symop
         def order(x):
-            return len(np.where(x.asym_symops == 16484)[0]) / len(x)
+            n_identity = np.count_nonzero(
+                np.asarray(x.asym_symops) == IDENTITY_SYMOP_CODE
+            )
+            return n_identity / len(x)
 
         for i, mol in enumerate(sorted(uc_molecules, key=order, reverse=True)):
             asym_atoms_in_g = np.unique(mol.properties["asymmetric_unit_atoms"])
@@ -507,7 +609,9 @@ class Crystal:
         for a slab consisting of multiple unit cells.
 
         If unit cell atoms have not been calculated, this calculates
-        their information and caches it.
+        their information and caches it. The slabs for the most recently
+        used bounds are also cached; the arrays in the returned dictionary
+        are shared between calls and should not be modified in place.
 
         Args:
             bounds (Tuple, optional): Tuple of upper and lower corners (hkl) describing the bounds
@@ -535,8 +639,13 @@ class Crystal:
             warn if any of these are greater than 1.0
 
         """
-        uc_atoms = self.unit_cell_atoms()
         (hmin, kmin, lmin), (hmax, kmax, lmax) = bounds
+        key = tuple(int(x) for x in (hmin, kmin, lmin, hmax, kmax, lmax))
+        if not hasattr(self, "_slab_cache"):
+            setattr(self, "_slab_cache", {})
+        if key in self._slab_cache:
+            return dict(self._slab_cache[key])
+        uc_atoms = self.unit_cell_atoms()
         h = np.arange(hmin, hmax + 1)
         k = np.arange(kmin, kmax + 1)
         l = np.arange(lmin, lmax + 1)  # noqa: E741
@@ -546,20 +655,46 @@ class Crystal:
         ncells = len(cells)
         uc_pos = uc_atoms["frac_pos"]
         n_uc = len(uc_pos)
-        pos = np.empty((ncells * n_uc, 3), dtype=np.float64)
-        slab_cells = np.empty((ncells * n_uc, 3), dtype=np.float64)
-        for i, cell in enumerate(cells):
-            pos[i * n_uc : (i + 1) * n_uc, :] = uc_pos + cell
-            slab_cells[i * n_uc : (i + 1) * n_uc] = cell
+        pos = (uc_pos[np.newaxis, :, :] + cells[:, np.newaxis, :]).reshape(
+            ncells * n_uc, 3
+        )
+        slab_cells = np.repeat(cells.astype(np.float64), n_uc, axis=0)
         slab_dict = {
-            k: np.tile(v, ncells) for k, v in uc_atoms.items() if not k.endswith("pos")
+            k: np.tile(v, (ncells,) + (1,) * (v.ndim - 1))
+            for k, v in uc_atoms.items()
+            if not k.endswith("pos")
         }
         slab_dict["frac_pos"] = pos
         slab_dict["cell"] = slab_cells
         slab_dict["n_uc"] = n_uc
         slab_dict["n_cells"] = ncells
-        slab_dict["cart_pos"] = self.to_cartesian(pos)
-        return slab_dict
+        # translations are linear in Cartesian space too, so avoid
+        # transforming every site in the slab
+        slab_dict["cart_pos"] = (
+            uc_atoms["cart_pos"][np.newaxis, :, :]
+            + self.to_cartesian(cells)[:, np.newaxis, :]
+        ).reshape(ncells * n_uc, 3)
+        if len(self._slab_cache) >= 8:
+            self._slab_cache.pop(next(iter(self._slab_cache)))
+        self._slab_cache[key] = slab_dict
+        return dict(slab_dict)
+
+    def _slab_tree(self, bounds) -> Tuple:
+        """The slab for `bounds` (see `slab`) along with a KDTree of its
+        Cartesian positions, cached for as long as the slab is."""
+        slab = self.slab(bounds=bounds)
+        key = tuple(int(x) for corner in bounds for x in corner)
+        if not hasattr(self, "_slab_tree_cache"):
+            setattr(self, "_slab_tree_cache", {})
+        cached = self._slab_tree_cache.get(key)
+        if cached is not None and cached[0] is slab["cart_pos"]:
+            return slab, cached[1]
+        tree = KDTree(slab["cart_pos"])
+        self._slab_tree_cache.pop(key, None)
+        if len(self._slab_tree_cache) >= 8:
+            self._slab_tree_cache.pop(next(iter(self._slab_tree_cache)))
+        self._slab_tree_cache[key] = (slab["cart_pos"], tree)
+        return slab, tree
 
     def atoms_in_radius(self, radius, origin=(0, 0, 0)) -> dict:
         """
@@ -575,14 +710,11 @@ class Crystal:
             of those atoms within `radius` of the `origin`.
         """
         frac_origin = self.to_fractional(origin)
-        frac_radius = radius / np.array(self.unit_cell.lengths)
-        hmax, kmax, lmax = np.ceil(frac_radius + frac_origin).astype(int)
-        hmin, kmin, lmin = np.floor(frac_origin - frac_radius).astype(int)
-        slab = self.slab(bounds=((hmin, kmin, lmin), (hmax, kmax, lmax)))
-        tree = KDTree(slab["cart_pos"])
-        idxs = sorted(tree.query_ball_point(origin, radius))
+        slab, tree = self._slab_tree(self._slab_bounds(frac_origin, radius))
+        idxs = np.asarray(tree.query_ball_point(origin, radius), dtype=np.intp)
+        idxs.sort()
         result = {k: v[idxs] for k, v in slab.items() if isinstance(v, np.ndarray)}
-        result["uc_atom"] = np.tile(np.arange(slab["n_uc"]), slab["n_cells"])[idxs]
+        result["uc_atom"] = idxs % slab["n_uc"]
         return result
 
     def atomic_surroundings(self, radius=6.0) -> List[Dict]:
@@ -597,20 +729,14 @@ class Crystal:
             A list of atomic number, Cartesian position for both the
             atomic site in question and the surroundings (as an array)
         """
-        cart_asym = self.to_cartesian(self.asymmetric_unit.positions)
-        hklmax = np.array([-np.inf, -np.inf, -np.inf])
-        hklmin = np.array([np.inf, np.inf, np.inf])
-        frac_radius = radius / np.array(self.unit_cell.lengths)
-        for pos in self.asymmetric_unit.positions:
-            hklmax = np.maximum(hklmax, np.ceil(frac_radius + pos))
-            hklmin = np.minimum(hklmin, np.floor(pos - frac_radius))
-        hmax, kmax, lmax = hklmax.astype(int)
-        hmin, kmin, lmin = hklmin.astype(int)
-        slab = self.slab(bounds=((hmin, kmin, lmin), (hmax, kmax, lmax)))
-        tree = KDTree(slab["cart_pos"])
+        cart_asym = self.cart_asymmetric_unit
+        slab, tree = self._slab_tree(
+            self._slab_bounds(self.asymmetric_unit.positions, radius)
+        )
+        neighbours = tree.query_ball_point(cart_asym, radius)
         results = []
         for i, (n, pos) in enumerate(zip(self.asymmetric_unit.elements, cart_asym)):
-            idxs = tree.query_ball_point(pos, radius)
+            idxs = neighbours[i]
             positions = slab["cart_pos"][idxs]
             elements = slab["element"][idxs]
             asym = slab["asym_atom"][idxs]
@@ -645,33 +771,17 @@ class Crystal:
             A list of atomic number, Cartesian position for both the
             atomic sites in question and their surroundings (as an array)
         """
-        hklmax = np.array([-np.inf, -np.inf, -np.inf])
-        hklmin = np.array([np.inf, np.inf, np.inf])
-        frac_radius = radius / np.array(self.unit_cell.lengths)
         mol = self.symmetry_unique_molecules()[0]
         central_positions = self.to_fractional(mol.positions[atoms])
         central_elements = mol.atomic_numbers[atoms]
         central_cart_positions = mol.positions[atoms]
 
-        for pos in central_positions:
-            hklmax = np.maximum(hklmax, np.ceil(frac_radius + pos))
-            hklmin = np.minimum(hklmin, np.floor(pos - frac_radius))
-        hmax, kmax, lmax = hklmax.astype(int)
-        hmin, kmin, lmin = hklmin.astype(int)
-        slab = self.slab(bounds=((hmin, kmin, lmin), (hmax, kmax, lmax)))
+        slab, tree = self._slab_tree(self._slab_bounds(central_positions, radius))
         elements = slab["element"]
         positions = slab["cart_pos"]
-        tree = KDTree(positions)
-        keep = np.zeros(positions.shape[0], dtype=bool)
-
-        this_mol = []
-        for pos in central_cart_positions:
-            idxs = tree.query_ball_point(pos, radius)
-            d, nn = tree.query(pos)
-            keep[idxs] = True
-            if d < 1e-3:
-                this_mol.append(nn)
-                keep[this_mol] = False
+        keep = _environment_mask(
+            tree, len(positions), central_cart_positions, radius, 1e-3
+        )
         return (
             (central_elements, central_cart_positions),
             (elements[keep], positions[keep]),
@@ -698,27 +808,12 @@ class Crystal:
                 and `positions` is an `np.ndarray` of Cartesian atomic positions
         """
 
-        hklmax = np.array([-np.inf, -np.inf, -np.inf])
-        hklmin = np.array([np.inf, np.inf, np.inf])
-        frac_radius = radius / np.array(self.unit_cell.lengths)
-        for pos in self.to_fractional(mol.positions):
-            hklmax = np.maximum(hklmax, np.ceil(frac_radius + pos))
-            hklmin = np.minimum(hklmin, np.floor(pos - frac_radius))
-        hmax, kmax, lmax = hklmax.astype(int)
-        hmin, kmin, lmin = hklmin.astype(int)
-        slab = self.slab(bounds=((hmin, kmin, lmin), (hmax, kmax, lmax)))
+        slab, tree = self._slab_tree(
+            self._slab_bounds(self.to_fractional(mol.positions), radius)
+        )
         elements = slab["element"]
         positions = slab["cart_pos"]
-        tree = KDTree(positions)
-        keep = np.zeros(positions.shape[0], dtype=bool)
-        this_mol = []
-        for pos in mol.positions:
-            idxs = tree.query_ball_point(pos, radius)
-            d, nn = tree.query(pos)
-            keep[idxs] = True
-            if d < threshold:
-                this_mol.append(nn)
-                keep[this_mol] = False
+        keep = _environment_mask(tree, len(positions), mol.positions, radius, threshold)
         return (mol, elements[keep], positions[keep])
 
     def molecule_environments(self, radius=6.0, threshold=1e-3) -> List[Tuple]:
@@ -738,10 +833,18 @@ class Crystal:
             where `elements` is an `np.ndarray` of atomic numbers,
             and `positions` is an `np.ndarray` of Cartesian atomic positions
         """
-        return [
-            self.molecule_environment(x, radius=radius, threshold=threshold)
-            for x in self.symmetry_unique_molecules()
-        ]
+        mols = self.symmetry_unique_molecules()
+        frac_pos = self.to_fractional(np.vstack([x.positions for x in mols]))
+        slab, tree = self._slab_tree(self._slab_bounds(frac_pos, radius))
+        elements = slab["element"]
+        positions = slab["cart_pos"]
+        results = []
+        for mol in mols:
+            keep = _environment_mask(
+                tree, len(positions), mol.positions, radius, threshold
+            )
+            results.append((mol, elements[keep], positions[keep]))
+        return results
 
     def functional_group_surroundings(self, radius=6.0, kind="carboxylic_acid") -> List:
         """
@@ -760,31 +863,18 @@ class Crystal:
             and `func_pos` and `neigh_pos` are `np.ndarray` of Cartesian atomic positions
         """
         results = []
-        for mol in self.symmetry_unique_molecules():
-            hklmax = np.array([-np.inf, -np.inf, -np.inf])
-            hklmin = np.array([np.inf, np.inf, np.inf])
-            frac_radius = radius / np.array(self.unit_cell.lengths)
-            for pos in self.to_fractional(mol.positions):
-                hklmax = np.maximum(hklmax, np.ceil(frac_radius + pos))
-                hklmin = np.minimum(hklmin, np.floor(pos - frac_radius))
-            hmax, kmax, lmax = hklmax.astype(int)
-            hmin, kmin, lmin = hklmin.astype(int)
-            slab = self.slab(bounds=((hmin, kmin, lmin), (hmax, kmax, lmax)))
-            elements = slab["element"]
-            positions = slab["cart_pos"]
-            tree = KDTree(positions)
+        mols = self.symmetry_unique_molecules()
+        frac_pos = self.to_fractional(np.vstack([x.positions for x in mols]))
+        slab, tree = self._slab_tree(self._slab_bounds(frac_pos, radius))
+        elements = slab["element"]
+        positions = slab["cart_pos"]
+        for mol in mols:
             groups = mol.functional_groups(kind=kind)
             for fg in groups:
                 fg = list(fg)
-                keep = np.zeros(positions.shape[0], dtype=bool)
-                inside = []
-                for pos in mol.positions[fg]:
-                    idxs = tree.query_ball_point(pos, radius)
-                    d, nn = tree.query(pos)
-                    keep[idxs] = True
-                    if d < 1e-3:
-                        inside.append(nn)
-                        keep[inside] = False
+                keep = _environment_mask(
+                    tree, len(positions), mol.positions[fg], radius, 1e-3
+                )
                 results.append(
                     (
                         mol.atomic_numbers[fg],
@@ -883,7 +973,6 @@ class Crystal:
         """
 
         from chmpy import PromoleculeDensity
-        import trimesh
         from chmpy.mc import marching_cubes
 
         vertex_color = kwargs.get("color", None)
@@ -898,35 +987,41 @@ class Crystal:
             x_grid = np.arange(0, 1.0, seps[0], dtype=np.float32)
             y_grid = np.arange(0, 1.0, seps[1], dtype=np.float32)
             z_grid = np.arange(0, 1.0, seps[2], dtype=np.float32)
-            x, y, z = np.meshgrid(x_grid, y_grid, z_grid)
-            shape = x.shape
-            pts = np.c_[x.ravel(), y.ravel(), z.ravel()]
-            pts = pts.astype(np.float32)
-            pts = self.to_cartesian(pts)
+            shape = (len(x_grid), len(y_grid), len(z_grid))
+            frac = np.empty(shape + (3,), dtype=np.float32)
+            frac[..., 0] = x_grid[:, np.newaxis, np.newaxis]
+            frac[..., 1] = y_grid[np.newaxis, :, np.newaxis]
+            frac[..., 2] = z_grid[np.newaxis, np.newaxis, :]
+            pts = frac.reshape(-1, 3) @ self.unit_cell.direct.astype(np.float32)
+            del frac
         elif grid_type == "box":
             ((x0, y0, z0), (x1, y1, z1)) = kwargs.get(
                 "box_corners", ((0.0, 0.0, 0.0), (5.0, 5.0, 5.0))
             )
-            x, y, z = np.mgrid[x0:x1:sep, y0:y1:sep, z0:z1:sep]
-            pts = np.c_[x.ravel(), y.ravel(), z.ravel()]
-            pts = pts.astype(np.float32)
-            shape = x.shape
+            x_grid = np.arange(x0, x1, sep, dtype=np.float32)
+            y_grid = np.arange(y0, y1, sep, dtype=np.float32)
+            z_grid = np.arange(z0, z1, sep, dtype=np.float32)
+            shape = (len(x_grid), len(y_grid), len(z_grid))
+            pts = np.empty(shape + (3,), dtype=np.float32)
+            pts[..., 0] = x_grid[:, np.newaxis, np.newaxis]
+            pts[..., 1] = y_grid[np.newaxis, :, np.newaxis]
+            pts[..., 2] = z_grid[np.newaxis, np.newaxis, :]
+            pts = pts.reshape(-1, 3)
             seps = (sep, sep, sep)
         else:
             raise NotImplementedError("Only uc grid supported currently")
-        tree = KDTree(atoms["cart_pos"])
-        distances, _ = tree.query(pts)
-        values = np.ones(pts.shape[0], dtype=np.float32)
-        mask = distances > 1.0  # minimum bigger than 1 angstrom
-        rho = density.rho(pts[mask])
-        values[mask] = rho
+        # points within 1 angstrom of any atom are filled with 1.0 (inside),
+        # the density is only summed for the rest, in a single pass
+        values = density.rho_or_fill(pts, cutoff=1.0, fill=1.0)
         values = values.reshape(shape)
         verts, faces, normals, _ = marching_cubes(
             values, isovalue, spacing=seps, gradient_direction="ascent"
         )
         if grid_type == "uc":
-            verts = self.to_cartesian(np.c_[verts[:, 1], verts[:, 0], verts[:, 2]])
-        mesh = trimesh.Trimesh(vertices=verts, faces=faces, normals=normals)
+            verts = self.to_cartesian(verts)
+            # wind faces so their normals point out of the void region
+            faces = faces[:, ::-1]
+        mesh = Trimesh(vertices=verts, faces=faces, normals=normals)
 
         if kwargs.get("subdivide", False):
             for _ in range(int(kwargs.get("subdivide", False))):
@@ -1009,6 +1104,8 @@ class Crystal:
                     matplotlib colormap to use for surface coloring (default 'viridis_r')
                 midpoint: float, optional, default 0.0 if using d_norm
                     use the midpoint norm (as is used in CrystalExplorer)
+                nthreads: int, optional
+                    number of threads used to compute the surfaces (default 1)
                 ```
 
         Returns:
@@ -1017,15 +1114,17 @@ class Crystal:
         from chmpy import StockholderWeight
         from chmpy.surface import stockholder_weight_isosurface
         from chmpy.util.color import property_to_color
-        import trimesh
 
         sep = kwargs.get("separation", kwargs.get("resolution", 0.2))
         radius = kwargs.get("radius", 12.0)
         vertex_color = kwargs.get("color", "d_norm")
         isovalue = kwargs.get("isovalue", 0.5)
+        nthreads = kwargs.get("nthreads", 1)
         meshes = []
-        extra_props = {}
-        isos = []
+        # (stockholder weight, extra_props) for each surface, the surfaces
+        # are independent so they can be computed concurrently
+        jobs = []
+
         def nearest_atomic_number(pos, n_e, n_p):
             return np.array(n_e[_nearest_atom_idx(pos, n_e, n_p)], dtype=np.uint8)
 
@@ -1038,37 +1137,47 @@ class Crystal:
                 s = StockholderWeight.from_arrays(
                     [n], [pos], neighbour_els, neighbour_pos
                 )
-                iso = stockholder_weight_isosurface(s, isovalue=isovalue, sep=sep)
-                isos.append(iso)
+                jobs.append((s, None))
         elif kind == "mol":
-            for i, (mol, n_e, n_p) in enumerate(
-                self.molecule_environments(radius=radius)
-            ):
+            for mol, n_e, n_p in self.molecule_environments(radius=radius):
+                # bind the current molecule and environment in each closure
+                extra_props = {}
                 if vertex_color == "esp":
                     extra_props["esp"] = mol.electrostatic_potential
                 elif vertex_color == "fragment_patch":
-                    extra_props["fragment_patch"] = lambda x: _nearest_molecule_idx(
-                        x, n_e, n_p
+                    extra_props["fragment_patch"] = (
+                        lambda x, n_e=n_e, n_p=n_p: _nearest_molecule_idx(x, n_e, n_p)
                     )
-                extra_props["nearest_atom_external"] = lambda x: nearest_atomic_number(x, n_e, n_p)
-                extra_props["nearest_atom_internal"] = lambda x: nearest_atomic_number(x, mol.atomic_numbers, mol.positions)
+                extra_props["nearest_atom_external"] = (
+                    lambda x, n_e=n_e, n_p=n_p: nearest_atomic_number(x, n_e, n_p)
+                )
+                extra_props["nearest_atom_internal"] = (
+                    lambda x, mol=mol: nearest_atomic_number(
+                        x, mol.atomic_numbers, mol.positions
+                    )
+                )
                 s = StockholderWeight.from_arrays(
                     mol.atomic_numbers, mol.positions, n_e, n_p
                 )
-                iso = stockholder_weight_isosurface(
-                    s, isovalue=isovalue, sep=sep, extra_props=extra_props
-                )
-                isos.append(iso)
+                jobs.append((s, extra_props))
         else:
             for arr in self.functional_group_surroundings(radius=radius, kind=kind):
-                s = StockholderWeight.from_arrays(*arr)
-                iso = stockholder_weight_isosurface(s, isovalue=isovalue, sep=sep)
-                isos.append(iso)
+                jobs.append((StockholderWeight.from_arrays(*arr), None))
+
+        with ThreadPoolExecutor(nthreads) as e:
+            isos = list(
+                e.map(
+                    lambda x: stockholder_weight_isosurface(
+                        x[0], isovalue=isovalue, sep=sep, extra_props=x[1]
+                    ),
+                    jobs,
+                )
+            )
 
         for iso in isos:
             prop = iso.vertex_prop[vertex_color]
             color = property_to_color(prop, cmap=kwargs.get("cmap", vertex_color))
-            mesh = trimesh.Trimesh(
+            mesh = Trimesh(
                 vertices=iso.vertices,
                 faces=iso.faces,
                 normals=iso.normals,
@@ -1080,7 +1189,7 @@ class Crystal:
         return meshes
 
     def functional_group_shape_descriptors(
-        self, l_max=5, radius=6.0, kind="carboxylic_acid"
+        self, l_max=5, radius=6.0, kind="carboxylic_acid", nthreads=1
     ) -> np.ndarray:
         """
         Calculate the shape descriptors `[1,2]` for the all atoms in the functional group
@@ -1092,6 +1201,7 @@ class Crystal:
             radius (float, optional): maximum distance (Angstroms) of neighbouring atoms to include in
                 stockholder weight calculation (default: 5)
             kind (str, optional): Identifier for the functional group type (default: 'carboxylic_acid')
+            nthreads (int, optional): number of threads to use (default 1)
 
         Returns:
             shape description vector
@@ -1104,31 +1214,30 @@ class Crystal:
             https://dx.doi.org/10.1002/anie.201906602
         ```
         """
-        descriptors = []
         from chmpy.shape import SHT, stockholder_weight_descriptor
 
         sph = SHT(l_max)
-        for (
-            in_els,
-            in_pos,
-            neighbour_els,
-            neighbour_pos,
-        ) in self.functional_group_surroundings(kind=kind, radius=radius):
-            masses = np.asarray([Element[x].mass for x in in_els])
-            c = np.sum(in_pos * masses[:, np.newaxis] / np.sum(masses), axis=0).astype(
-                np.float32
+
+        def descriptor(surroundings):
+            in_els, in_pos, neighbour_els, neighbour_pos = surroundings
+            masses = atomic_masses(in_els)
+            c = (np.dot(masses, in_pos) / np.sum(masses)).astype(np.float32)
+            bounds = _descriptor_bounds(in_pos, c)
+            return stockholder_weight_descriptor(
+                sph,
+                in_els,
+                in_pos,
+                neighbour_els,
+                neighbour_pos,
+                origin=c,
+                bounds=bounds,
             )
-            dists = np.linalg.norm(in_pos - c, axis=1)
-            bounds = np.min(dists) / 2, np.max(dists) + 10.0
-            descriptors.append(
-                stockholder_weight_descriptor(
-                    sph,
-                    in_els,
-                    in_pos,
-                    neighbour_els,
-                    neighbour_pos,
-                    origin=c,
-                    bounds=bounds,
+
+        with ThreadPoolExecutor(nthreads) as e:
+            descriptors = list(
+                e.map(
+                    descriptor,
+                    self.functional_group_surroundings(kind=kind, radius=radius),
                 )
             )
         return np.asarray(descriptors)
@@ -1165,8 +1274,7 @@ class Crystal:
             mol, radius=radius
         )
         c = np.array(mol.centroid, dtype=np.float32)
-        dists = np.linalg.norm(mol.positions - c, axis=1)
-        bounds = np.min(dists) / 2, np.max(dists) + 10.0
+        bounds = _descriptor_bounds(mol.positions, c)
         return stockholder_weight_descriptor(
             sph,
             mol.atomic_numbers,
@@ -1179,7 +1287,12 @@ class Crystal:
         )
 
     def molecular_shape_descriptors(
-        self, l_max=5, radius=6.0, with_property=None, return_coefficients=False
+        self,
+        l_max=5,
+        radius=6.0,
+        with_property=None,
+        return_coefficients=False,
+        nthreads=1,
     ) -> np.ndarray:
         """
         Calculate the molecular shape descriptors[1,2] for all symmetry unique
@@ -1192,6 +1305,7 @@ class Crystal:
                 in the shape description
             with_property (str, optional): name of the surface property to include in the shape description
             return_coefficients (bool, optional): also return the spherical harmonic coefficients
+            nthreads (int, optional): number of threads to use (default 1)
 
         Returns:
             shape description vector
@@ -1209,13 +1323,12 @@ class Crystal:
         from chmpy.shape import SHT, stockholder_weight_descriptor
 
         sph = SHT(l_max)
-        for mol, neighbour_els, neighbour_pos in self.molecule_environments(
-            radius=radius
-        ):
+
+        def descriptor(environment):
+            mol, neighbour_els, neighbour_pos = environment
             c = np.array(mol.centroid, dtype=np.float32)
-            dists = np.linalg.norm(mol.positions - c, axis=1)
-            bounds = np.min(dists) / 2, np.max(dists) + 10.0
-            descriptor = stockholder_weight_descriptor(
+            bounds = _descriptor_bounds(mol.positions, c)
+            return stockholder_weight_descriptor(
                 sph,
                 mol.atomic_numbers,
                 mol.positions,
@@ -1227,18 +1340,25 @@ class Crystal:
                 coefficients=return_coefficients,
             )
 
-            if return_coefficients:
-                coeffs.append(descriptor[0])
-                descriptors.append(descriptor[1])
-            else:
-                descriptors.append(descriptor)
+        with ThreadPoolExecutor(nthreads) as e:
+            for desc in e.map(descriptor, self.molecule_environments(radius=radius)):
+                if return_coefficients:
+                    coeffs.append(desc[0])
+                    descriptors.append(desc[1])
+                else:
+                    descriptors.append(desc)
         if return_coefficients:
             return np.asarray(coeffs), np.asarray(descriptors)
         else:
             return np.asarray(descriptors)
 
     def atomic_shape_descriptors(
-        self, l_max=5, radius=6.0, return_coefficients=False, with_property=None
+        self,
+        l_max=5,
+        radius=6.0,
+        return_coefficients=False,
+        with_property=None,
+        nthreads=1,
     ) -> np.ndarray:
         """
         Calculate the shape descriptors[1,2] for all symmetry unique
@@ -1251,6 +1371,7 @@ class Crystal:
                 in the shape description
             with_property (str, optional): name of the surface property to include in the shape description
             return_coefficients (bool, optional): also return the spherical harmonic coefficients
+            nthreads (int, optional): number of threads to use (default 1)
 
         Returns:
             shape description vector
@@ -1268,14 +1389,15 @@ class Crystal:
         from chmpy.shape import SHT, stockholder_weight_descriptor
 
         sph = SHT(l_max)
-        for surrounds in self.atomic_surroundings(radius=radius):
+
+        def descriptor(surrounds):
             n = surrounds["centre"]["element"]
             pos = surrounds["centre"]["cart_pos"]
             neighbour_els = surrounds["neighbours"]["element"]
             neighbour_pos = surrounds["neighbours"]["cart_pos"]
 
             ubound = Element[n].vdw_radius * 3 + 2.0
-            desc = stockholder_weight_descriptor(
+            return stockholder_weight_descriptor(
                 sph,
                 [n],
                 [pos],
@@ -1285,11 +1407,14 @@ class Crystal:
                 coefficients=return_coefficients,
                 with_property=with_property,
             )
-            if return_coefficients:
-                descriptors.append(desc[1])
-                coeffs.append(desc[0])
-            else:
-                descriptors.append(desc)
+
+        with ThreadPoolExecutor(nthreads) as e:
+            for desc in e.map(descriptor, self.atomic_surroundings(radius=radius)):
+                if return_coefficients:
+                    descriptors.append(desc[1])
+                    coeffs.append(desc[0])
+                else:
+                    descriptors.append(desc)
         if return_coefficients:
             return np.asarray(coeffs), np.asarray(descriptors)
         else:
@@ -1323,8 +1448,7 @@ class Crystal:
         inside, outside = self.atom_group_surroundings(atoms, radius=radius)
         m = Molecule.from_arrays(*inside)
         c = np.array(m.centroid, dtype=np.float32)
-        dists = np.linalg.norm(m.positions - c, axis=1)
-        bounds = np.min(dists) / 2, np.max(dists) + 10.0
+        bounds = _descriptor_bounds(m.positions, c)
         return np.asarray(
             stockholder_weight_descriptor(
                 sph, *inside, *outside, origin=c, bounds=bounds
@@ -1364,7 +1488,7 @@ class Crystal:
         "Calculated density of this crystal structure in g/cm^3"
         if "density" in self.properties:
             return self.properties["density"]
-        uc_mass = sum(Element[x].mass for x in self.unit_cell_atoms()["element"])
+        uc_mass = np.sum(atomic_masses(self.unit_cell_atoms()["element"]))
         uc_vol = self.unit_cell.volume()
         return uc_mass / uc_vol / 0.6022
 
@@ -1442,14 +1566,19 @@ class Crystal:
                     "need one of _atom_site_label or "
                     "_atom_site_type_symbol present"
                 )
-            elements = [Element[x] for x in labels]
-        else:
-            elements = [Element[x] for x in symbols]
-        x = np.asarray(cif_data.get("atom_site_fract_x", []))
-        y = np.asarray(cif_data.get("atom_site_fract_y", []))
-        z = np.asarray(cif_data.get("atom_site_fract_z", []))
-        occupation = np.asarray(cif_data.get("atom_site_occupancy", [1] * len(x)))
-        frac_pos = np.array([x, y, z]).T
+            symbols = labels
+        # type symbols repeat, so only parse each distinct one
+        element_lookup = {x: Element[x] for x in set(symbols)}
+        elements = [element_lookup[x] for x in symbols]
+        frac_pos = np.column_stack(
+            [
+                np.asarray(cif_data.get(f"atom_site_fract_{x}", []), dtype=np.float64)
+                for x in ("x", "y", "z")
+            ]
+        )
+        occupation = np.asarray(
+            cif_data.get("atom_site_occupancy", [1] * len(frac_pos))
+        )
         asym = AsymmetricUnit(
             elements=elements, positions=frac_pos, labels=labels, occupation=occupation
         )
@@ -1636,14 +1765,17 @@ class Crystal:
         version = "1.0a1"
         if data_block_name is None:
             data_block_name = self.titl
+        # plain lists of floats rather than array slices, the CIF writer
+        # formats each value individually
+        frac_x, frac_y, frac_z = self.asymmetric_unit.positions.T.tolist()
         if "cif_data" in self.properties:
             cif_data = self.properties["cif_data"]
             cif_data[
                 "audit_creation_method"
             ] = f"chmpy python library version {version}"
-            cif_data["atom_site_fract_x"] = self.asymmetric_unit.positions[:, 0]
-            cif_data["atom_site_fract_y"] = self.asymmetric_unit.positions[:, 1]
-            cif_data["atom_site_fract_z"] = self.asymmetric_unit.positions[:, 2]
+            cif_data["atom_site_fract_x"] = frac_x
+            cif_data["atom_site_fract_y"] = frac_y
+            cif_data["atom_site_fract_z"] = frac_z
         else:
             cif_data = {
                 "audit_creation_method": f"chmpy python library version {version}",
@@ -1658,12 +1790,12 @@ class Crystal:
                 "cell_angle_beta": self.unit_cell.beta_deg,
                 "cell_angle_gamma": self.unit_cell.gamma_deg,
                 "atom_site_label": self.asymmetric_unit.labels,
-                "atom_site_type_symbol": [
-                    x.symbol for x in self.asymmetric_unit.elements
-                ],
-                "atom_site_fract_x": self.asymmetric_unit.positions[:, 0],
-                "atom_site_fract_y": self.asymmetric_unit.positions[:, 1],
-                "atom_site_fract_z": self.asymmetric_unit.positions[:, 2],
+                "atom_site_type_symbol": element_symbols(
+                    self.asymmetric_unit.atomic_numbers
+                ),
+                "atom_site_fract_x": frac_x,
+                "atom_site_fract_y": frac_y,
+                "atom_site_fract_z": frac_z,
                 "atom_site_occupancy": self.asymmetric_unit.properties.get(
                     "occupation", np.ones(len(self.asymmetric_unit))
                 ),
@@ -1758,8 +1890,8 @@ class Crystal:
         """Represent this crystal structure as a shelx .res formatted string"""
         from chmpy.fmt.shelx import to_res_contents
 
-        sfac = list(np.unique(self.site_atoms))
-        atom_sfac = [sfac.index(x) + 1 for x in self.site_atoms]
+        sfac, atom_sfac = np.unique(self.site_atoms, return_inverse=True)
+        atom_row = "{:3} {:3} {: 20.12f} {: 20.12f} {: 20.12f}"
         shelx_data = {
             "TITL": self.titl if titl is None else titl,
             "CELL": self.unit_cell.parameters,
@@ -1771,9 +1903,11 @@ class Crystal:
             ],
             "LATT": self.space_group.latt,
             "ATOM": [
-                "{:3} {:3} {: 20.12f} {: 20.12f} {: 20.12f}".format(l, s, *pos)
-                for l, s, pos in zip(
-                    self.asymmetric_unit.labels, atom_sfac, self.site_positions
+                atom_row.format(label, s, x, y, z)
+                for label, s, (x, y, z) in zip(
+                    self.asymmetric_unit.labels,
+                    (atom_sfac + 1).tolist(),
+                    self.site_positions.tolist(),
                 )
             ],
         }
@@ -1814,6 +1948,7 @@ class Crystal:
         new_uc = UnitCell(np.dot(T, self.unit_cell.direct))
         self.unit_cell = new_uc
         self.asymmetric_unit.positions = self.to_fractional(cart_asym_pos)
+        self._clear_slab_cache()
         self.space_group = SpaceGroup(
             self.space_group.international_tables_number, choice=choice
         )
@@ -1902,15 +2037,10 @@ class Crystal:
         from copy import deepcopy
         from collections import defaultdict
 
-        hklmax = np.array([-np.inf, -np.inf, -np.inf])
-        hklmin = np.array([np.inf, np.inf, np.inf])
         frac_radius = radius * 2 / np.array(self.unit_cell.lengths)
-
-        for pos in self.asymmetric_unit.positions:
-            hklmax = np.maximum(hklmax, np.ceil(frac_radius + pos))
-            hklmin = np.minimum(hklmin, np.floor(pos - frac_radius))
-        hklmin = np.minimum(hklmin, (-1, -1, -1))
-        hklmax = np.maximum(hklmax, (1, 1, 1))
+        asym_pos = self.asymmetric_unit.positions
+        hklmax = np.maximum(np.ceil(asym_pos.max(axis=0) + frac_radius), (1, 1, 1))
+        hklmin = np.minimum(np.floor(asym_pos.min(axis=0) - frac_radius), (-1, -1, -1))
 
         hmax, kmax, lmax = hklmax.astype(int)
         hmin, kmin, lmin = hklmin.astype(int)
@@ -1979,7 +2109,7 @@ class Crystal:
         npos = np.vstack(npos)
         nidx = np.hstack(nidx)
         tree = KDTree(npos)
-        distances, idx = tree.query(points)
+        distances, idx = tree.query(points, workers=-1)
         return neighbour_info, nidx[idx]
 
     def normalize_hydrogen_bondlengths(self, bond_tolerance=0.4, **kwargs):
@@ -1994,7 +2124,7 @@ class Crystal:
         H_idxs = np.where(nums == 1)[0]
         conn, t = self.unit_cell_connectivity(bond_tolerance=bond_tolerance, **kwargs)
         d = 0.0
-        for key in conn.keys():
+        for key in t.keys():
             for h in H_idxs:
                 if h in key:
                     at = key[1 if key.index(h) == 0 else 0]
@@ -2009,3 +2139,4 @@ class Crystal:
                 v_xh = BONDLENGTHS[el] * v_xh / norm
                 pos_cart[h, :] = pos_cart[at, :] + v_xh
         self.asymmetric_unit.positions = self.to_fractional(pos_cart)
+        self._clear_slab_cache()
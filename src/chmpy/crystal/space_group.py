@@ -7,6 +7,7 @@ from copy import deepcopy
 from chmpy.util.text import subscript, overline
 from .point_group import PointGroup
 from .symmetry_operation import (
+    IDENTITY_SYMOP_CODE,
     SymmetryOperation,
     expanded_symmetry_list,
     reduced_symmetry_list,
@@ -57,6 +58,19 @@ SG_DEFAULT_SETTING_CHOICE = {
     228: "2",
 }
 
+# decoded symmetry operations keyed by (number, choice), shared between
+# SpaceGroup instances since SymmetryOperation objects are immutable
+_SYMOPS_CACHE = {}
+
+
+def _symmetry_operations(sgdata):
+    key = (sgdata.number, sgdata.choice)
+    symops = _SYMOPS_CACHE.get(key)
+    if symops is None:
+        symops = tuple(SymmetryOperation.from_integer_codes(sgdata.symops))
+        _SYMOPS_CACHE[key] = symops
+    return symops
+
 
 class SpaceGroup:
     """
@@ -100,10 +114,7 @@ class SpaceGroup:
         self._point_group = PointGroup.from_number(sgdata.pointgroup, choice=choice)
         self.schoenflies = sgdata.schoenflies
         self.centrosymmetric = sgdata.centrosymmetric
-        symops = sgdata.symops
-        self.symmetry_operations = [
-            SymmetryOperation.from_integer_code(s) for s in symops
-        ]
+        self.symmetry_operations = list(_symmetry_operations(sgdata))
         self._sgdata = sgdata
 
     @property
@@ -283,24 +294,44 @@ class SpaceGroup:
                 operations in this space group.
         """
         nsites = len(coordinates)
-        transformed = np.empty((nsites * len(self), 3))
-        generator_symop = np.empty(nsites * len(self), dtype=np.int32)
-
+        transformed = np.empty((len(self), nsites, 3))
+        codes, rotations, translations = self._stacked_symops()
+        transformed[0] = coordinates
+        if len(codes) > 1:
+            np.matmul(coordinates, rotations, out=transformed[1:])
+            transformed[1:] += translations[:, np.newaxis, :]
+        generator_symop = np.repeat(codes, nsites)
+        return generator_symop, transformed.reshape(-1, 3)
+
+    def _stacked_symops(self):
+        """
+        The integer codes, transposed rotations and translations of the
+        symmetry operations stacked into arrays, identity first. The identity
+        itself is omitted from the rotations and translations.
+        """
+        symops = self.symmetry_operations
+        cached = getattr(self, "_stacked_symops_cache", None)
+        if cached is not None and cached[0] is symops:
+            return cached[1]
         # make sure we do the unit symop first
         unity = 0
-        for i, s in enumerate(self.symmetry_operations):
-            if s.integer_code == 16484:
+        for i, s in enumerate(symops):
+            if s.integer_code == IDENTITY_SYMOP_CODE:
                 unity = i
                 break
-        transformed[0:nsites] = coordinates
-        generator_symop[0:nsites] = 16484
-        other_symops = (
-            self.symmetry_operations[:unity] + self.symmetry_operations[unity + 1 :]
-        )
-        for i, s in enumerate(other_symops, start=1):
-            transformed[i * nsites : (i + 1) * nsites] = s(coordinates)
-            generator_symop[i * nsites : (i + 1) * nsites] = s.integer_code
-        return generator_symop, transformed
+        other_symops = symops[:unity] + symops[unity + 1 :]
+        codes = np.empty(len(symops), dtype=np.int32)
+        codes[0] = IDENTITY_SYMOP_CODE
+        codes[1:] = [s.integer_code for s in other_symops]
+        if other_symops:
+            rotations = np.stack([s.rotation.T for s in other_symops])
+            translations = np.stack([s.translation for s in other_symops])
+        else:
+            rotations = np.empty((0, 3, 3))
+            translations = np.empty((0, 3))
+        result = (codes, rotations, translations)
+        self._stacked_symops_cache = (symops, result)
+        return result
 
     def __repr__(self):
         return "<{} {}: {}>".format(
@@ -1,14 +1,21 @@
 from fractions import Fraction
+from math import gcd
 import logging
 import numpy as np
-import re
 from collections import namedtuple
 from copy import deepcopy
 
 LOG = logging.getLogger(__name__)
 
+# integer code (see `encode_symm_int`) of the identity operation '+x,+y,+z'
+IDENTITY_SYMOP_CODE = 16484
 
-SYMM_STR_SYMBOL_REGEX = re.compile(r".*?([+-]*[xyz0-9\/\.]+)")
+# characters making up the symbols of a symop string e.g. '1/2', 'x'
+_SYMM_STR_SYMBOL_CHARS = frozenset("xyz0123456789/.")
+
+# place values of the rotation (row-major) and translation digits in integer codes
+_ROTATION_SHIFTS = 3 ** np.arange(8, -1, -1, dtype=np.int64)
+_TRANSLATION_SHIFTS = np.array((144, 12, 1), dtype=np.int64)
 
 
 LATTICE_TYPE_TRANSLATIONS = {
@@ -44,10 +51,7 @@ def encode_symm_str(rotation, translation):
     symbols = "xyz"
     res = []
     for i in (0, 1, 2):
-        t = Fraction(translation[i]).limit_denominator(12)
-        v = ""
-        if t != 0:
-            v += str(t)
+        v = _translation_str(translation[i])
         for j in range(0, 3):
             c = rotation[i][j]
             if c != 0:
@@ -58,6 +62,20 @@ def encode_symm_str(rotation, translation):
     return res
 
 
+def _translation_str(t):
+    """The shortest fraction (denominator at most 12) for t, '' if zero"""
+    n = round(t * 12)
+    if abs(t * 12 - n) > 1e-6:
+        t = Fraction(t).limit_denominator(12)
+        return str(t) if t != 0 else ""
+    if n == 0:
+        return ""
+    g = gcd(n, 12)
+    if g == 12:
+        return str(n // 12)
+    return "{}/{}".format(n // g, 12 // g)
+
+
 def decode_symm_str(s):
     """
     Decode a symmetry operation represented in the string
@@ -79,34 +97,40 @@ def decode_symm_str(s):
     translation = np.zeros((3,), dtype=np.float64)
     tokens = s.lower().replace(" ", "").split(",")
     for i, row in enumerate(tokens):
-        fac = 1
-        row = row.strip()
-        symbols = re.findall(SYMM_STR_SYMBOL_REGEX, row)
-        for symbol in symbols:
-            if "x" in symbol:
-                idx = 0
-                fac = -1 if "-x" in symbol else 1
-                rotation[i, idx] = fac
-            elif "y" in symbol:
-                idx = 1
-                fac = -1 if "-y" in symbol else 1
-                rotation[i, idx] = fac
-            elif "z" in symbol:
-                idx = 2
-                fac = -1 if "-z" in symbol else 1
-                rotation[i, idx] = fac
-            else:
-                if "/" in symbol:
-                    numerator, denominator = symbol.split("/")
-                    translation[i] = Fraction(
-                        Fraction(numerator), Fraction(denominator)
-                    )
-                else:
-                    translation[i] += float(Fraction(symbol))
+        # single pass: a symbol is a run of _SYMM_STR_SYMBOL_CHARS,
+        # taking its sign from the '+' or '-' directly before it
+        sign = 1
+        start = -1
+        for j, ch in enumerate(row):
+            if ch in _SYMM_STR_SYMBOL_CHARS:
+                if start < 0:
+                    start = j
+                continue
+            if start >= 0:
+                _apply_symm_str_symbol(row[start:j], sign, i, rotation, translation)
+                start = -1
+            sign = -1 if ch == "-" else 1
+        if start >= 0:
+            _apply_symm_str_symbol(row[start:], sign, i, rotation, translation)
     translation = translation % 1
     return rotation, translation
 
 
+def _apply_symm_str_symbol(symbol, sign, i, rotation, translation):
+    "Set row i of rotation/translation from one signed symbol of a symop string"
+    if "x" in symbol:
+        rotation[i, 0] = sign
+    elif "y" in symbol:
+        rotation[i, 1] = sign
+    elif "z" in symbol:
+        rotation[i, 2] = sign
+    elif "/" in symbol:
+        numerator, denominator = symbol.split("/")
+        translation[i] = sign * float(numerator) / float(denominator)
+    else:
+        translation[i] += sign * float(symbol)
+
+
 def decode_symm_int(coded_integer):
     """
     Decode an integer encoded symmetry operation.
@@ -147,6 +171,29 @@ def decode_symm_int(coded_integer):
     return rotation, translation
 
 
+def decode_symm_ints(coded_integers):
+    """
+    Decode an array of integer encoded symmetry operations at once,
+    see `decode_symm_int` for details of the encoding.
+
+    >>> rot, trans = decode_symm_ints([16484, 1433663])
+    >>> [encode_symm_str(r, t) for r, t in zip(rot, trans)]
+    ['+x,+y,+z', '+x,1/2+y,+y+z']
+
+    Args:
+        coded_integers (array_like): (N) integers encoding symmetry operations
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (N,3,3) rotation matrices, (N,3) translation vectors
+    """
+    codes = np.asarray(coded_integers, dtype=np.int64).reshape(-1, 1)
+    r = codes % 19683  # 19683 = 3**9
+    rotation = (r // _ROTATION_SHIFTS) % 3 - 1
+    t = codes // 19683
+    translation = ((t // _TRANSLATION_SHIFTS) % 12) / 12
+    return rotation.reshape(-1, 3, 3).astype(np.float64), translation
+
+
 def encode_symm_int(rotation, translation):
     """
     Encode an integer encoded symmetry from a rotation matrix and translation
@@ -174,21 +221,30 @@ def encode_symm_int(rotation, translation):
     Returns:
         int: the encoded symmetry operation
     """
+    return int(encode_symm_ints(rotation, translation)[0])
+
 
-    r = 0
-    shift = 1
-    # encode rotation component
-    rotation = np.round(np.array(rotation)).astype(int) + 1
-    for i in (2, 1, 0):
-        for j in (2, 1, 0):
-            r += rotation[i, j] * shift
-            shift *= 3
-    t = 0
-    shift = 1
-    translation = np.round(np.array(translation) * 12).astype(int)
-    for i in (2, 1, 0):
-        t += translation[i] * shift
-        shift *= 12
+def encode_symm_ints(rotations, translations):
+    """
+    Encode many symmetry operations as integers at once, see
+    `encode_symm_int` for details of the encoding.
+
+    >>> encode_symm_ints(np.eye(3)[np.newaxis], np.zeros((1, 3)))
+    array([16484])
+
+    Args:
+        rotations (array_like): (N,3,3) matrices of -1, 0, or 1s encoding the rotation
+            components of the symmetry operations
+        translations (array_like): (N,3) vectors of rational numbers encoding the translation
+            components of the symmetry operations
+
+    Returns:
+        np.ndarray: (N) array of the encoded symmetry operations
+    """
+    rotations = np.round(np.asarray(rotations)).astype(np.int64).reshape(-1, 9) + 1
+    translations = np.round(np.asarray(translations) * 12).astype(np.int64)
+    r = rotations @ _ROTATION_SHIFTS
+    t = translations.reshape(-1, 3) @ _TRANSLATION_SHIFTS
     return r + t * 19683
 
 
@@ -205,7 +261,9 @@ class SymmetryOperation:
     rotation: np.ndarray
     translation: np.ndarray
 
-    def __init__(self, rotation, translation):
+    __slots__ = ("rotation", "translation", "_integer_code", "_string_code", "_seitz")
+
+    def __init__(self, rotation, translation, integer_code=None):
         """
         Construct a new symmetry operation from a rotation matrix and
         a translation vector
@@ -213,29 +271,34 @@ class SymmetryOperation:
         Arguments:
             rotation (np.ndarray): (3, 3) rotation matrix
             translation (np.ndarray): (3) translation vector
+            integer_code (int, optional): the packed integer code of this
+                operation, if already known
 
         Returns:
             SymmetryOperation: a new SymmetryOperation
         """
         self.rotation = rotation
         self.translation = translation % 1
+        if integer_code is None:
+            integer_code = encode_symm_int(self.rotation, self.translation)
+        self._integer_code = integer_code
+        self._string_code = None
+        self._seitz = None
 
     @property
     def seitz_matrix(self) -> np.ndarray:
         "The Seitz matrix form of this SymmetryOperation"
-        s = np.eye(4, dtype=np.float64)
-        s[:3, :3] = self.rotation
-        s[:3, 3] = self.translation
-        return s
+        if self._seitz is None:
+            s = np.eye(4, dtype=np.float64)
+            s[:3, :3] = self.rotation
+            s[:3, 3] = self.translation
+            self._seitz = s
+        return self._seitz
 
     @property
     def integer_code(self) -> int:
         "Represent this SymmetryOperation as a packed integer"
-        if not hasattr(self, "_integer_code"):
-            setattr(
-                self, "_integer_code", encode_symm_int(self.rotation, self.translation)
-            )
-        return getattr(self, "_integer_code")
+        return self._integer_code
 
     @property
     def cif_form(self) -> str:
@@ -286,20 +349,18 @@ class SymmetryOperation:
             return np.dot(coordinates, self.rotation.T) + self.translation
 
     def __str__(self):
-        if not hasattr(self, "_string_code"):
-            setattr(
-                self, "_string_code", encode_symm_str(self.rotation, self.translation)
-            )
-        return getattr(self, "_string_code")
+        if self._string_code is None:
+            self._string_code = encode_symm_str(self.rotation, self.translation)
+        return self._string_code
 
     def __lt__(self, other):
-        return self.integer_code < other.integer_code
+        return self._integer_code < other._integer_code
 
     def __eq__(self, other):
-        return self.integer_code == other.integer_code
+        return self._integer_code == other._integer_code
 
     def __hash__(self):
-        return int(self.integer_code)
+        return int(self._integer_code)
 
     def __repr__(self):
         return "<{}: {}>".format(self.__class__.__name__, self)
@@ -323,9 +384,25 @@ class SymmetryOperation:
         """
 
         rot, trans = decode_symm_int(code)
-        s = SymmetryOperation(rot, trans)
-        setattr(s, "_integer_code", code)
-        return s
+        return SymmetryOperation(rot, trans, integer_code=code)
+
+    @classmethod
+    def from_integer_codes(cls, codes):
+        """
+        Alternative constructor for many integer-encoded symmetry
+        operations, decoding them all at once.
+
+        Args:
+            codes (List[int]): integer-encoded symmetry operations
+
+        Returns:
+            List[SymmetryOperation]: new symmetry operations from the provided integer codes
+        """
+        rotations, translations = decode_symm_ints(codes)
+        return [
+            SymmetryOperation(rot, trans, integer_code=code)
+            for code, rot, trans in zip(codes, rotations, translations)
+        ]
 
     @classmethod
     def from_string_code(cls, code: str):
@@ -343,17 +420,17 @@ class SymmetryOperation:
         """
         rot, trans = decode_symm_str(code)
         s = SymmetryOperation(rot, trans)
-        setattr(s, "_string_code", code)
+        s._string_code = code
         return s
 
     def is_identity(self) -> bool:
         "Returns true if this is the identity symmetry operation '+x,+y,+z'"
-        return self.integer_code == 16484
+        return self._integer_code == IDENTITY_SYMOP_CODE
 
     @classmethod
     def identity(cls):
         "Alternative constructor for the the identity symop i.e. x,y,z"
-        return cls.from_integer_code(16484)
+        return cls.from_integer_code(IDENTITY_SYMOP_CODE)
 
 
 def expanded_symmetry_list(reduced_symops, lattice_type):
@@ -385,15 +462,24 @@ def expanded_symmetry_list(reduced_symops, lattice_type):
         reduced_symops.append(identity)
     LOG.debug("Reduced symmetry list contains %d symops", len(reduced_symops))
 
-    full_symops = []
-
-    for symop in reduced_symops:
-        full_symops.append(symop)
-        for t in translations:
-            full_symops.append(symop + t)
+    # each symop followed by its copies under the lattice translations
+    shifts = np.zeros((len(translations) + 1, 3))
+    if translations:
+        shifts[1:] = translations
+    rotations = np.stack([s.rotation for s in reduced_symops])
+    rotations = np.repeat(rotations, shifts.shape[0], axis=0)
+    translations = np.stack([s.translation for s in reduced_symops])
+    translations = ((translations[:, np.newaxis, :] + shifts) % 1).reshape(-1, 3)
 
     if lattice_type > 0:
-        full_symops += [x.inverted() for x in full_symops]
+        rotations = np.concatenate((rotations, -rotations))
+        translations = np.concatenate((translations, -translations % 1))
+
+    codes = encode_symm_ints(rotations, translations).tolist()
+    full_symops = [
+        SymmetryOperation(rot, trans, integer_code=code)
+        for rot, trans, code in zip(rotations, translations, codes)
+    ]
 
     LOG.debug("Expanded symmetry list contains %d symops", len(full_symops))
     return full_symops
@@ -423,24 +509,25 @@ def reduced_symmetry_list(full_symops, lattice_type):
     translations = LATTICE_TYPE_TRANSLATIONS[lattice_type_value]
 
     reduced_symops = [SymmetryOperation.identity()]
-    symops_to_process = list(full_symops)
+    # integer codes of reduced_symops, for constant time membership tests
+    reduced_codes = {IDENTITY_SYMOP_CODE}
 
     inversion = lattice_type > 0
 
-    while symops_to_process:
-        next_symop = symops_to_process.pop(0)
-        if next_symop in reduced_symops:
+    for next_symop in full_symops:
+        if next_symop.integer_code in reduced_codes:
             continue
-        if inversion and next_symop.inverted() in reduced_symops:
+        if inversion and next_symop.inverted().integer_code in reduced_codes:
             continue
         for t in translations:
             x = next_symop + t
-            if inversion and x.inverted() in reduced_symops:
+            if inversion and x.inverted().integer_code in reduced_codes:
                 break
-            if x in reduced_symops:
+            if x.integer_code in reduced_codes:
                 break
         else:
             reduced_symops.append(next_symop)
+            reduced_codes.add(next_symop.integer_code)
 
     LOG.debug("Reduced symmetry list contains %d symops", len(reduced_symops))
     return reduced_symops
@@ -1,10 +1,58 @@
 import logging
+import math
 import numpy as np
-from numpy import zeros, allclose as close
 
 LOG = logging.getLogger(__name__)
 
 
+def _inverse_3x3(m):
+    "Closed form inverse of a 3x3 matrix, via its adjugate and determinant"
+    (a, b, c), (d, e, f), (g, h, i) = m.tolist()
+    c11, c12, c13 = e * i - f * h, f * g - d * i, d * h - e * g
+    det = a * c11 + b * c12 + c * c13
+    if det == 0.0:
+        raise np.linalg.LinAlgError("Singular matrix")
+    r = 1.0 / det
+    return np.array(
+        (
+            (c11 * r, (c * h - b * i) * r, (b * f - c * e) * r),
+            (c12 * r, (a * i - c * g) * r, (c * d - a * f) * r),
+            (c13 * r, (b * g - a * h) * r, (a * e - b * d) * r),
+        )
+    )
+
+
+def _close(x, y):
+    "Scalar equivalent of np.allclose(x, y) with its default tolerances"
+    return abs(x - y) <= 1e-8 + 1e-5 * abs(y)
+
+
+def _cell_volume(a, b, c, ca, cb, cg):
+    "Volume of a cell from its side lengths and the cosines of its angles"
+    x = 1 - ca * ca - cb * cb - cg * cg + 2 * ca * cb * cg
+    # impossible angles give nan, as np.sqrt would
+    return a * b * c * math.sqrt(x) if x >= 0 else math.nan
+
+
+def _angle_between(u, v):
+    "Angle in radians between two unit vectors given as sequences of 3 floats"
+    d = u[0] * v[0] + u[1] * v[1] + u[2] * v[2]
+    return math.acos(min(1.0, max(-1.0, d)))
+
+
+# cell_type_index -> (cell_type, indices of the unique parameters in
+# (a, b, c, alpha, beta, gamma), the same for unique_parameters_deg)
+_CELL_TYPES = {
+    0: ("triclinic", (0, 1, 2, 3, 4, 5), (0, 1, 2, 3, 4, 5)),
+    1: ("monoclinic", (0, 1, 2, 4), (0, 1, 4)),
+    2: ("orthorhombic", (0, 1, 2), (0, 1, 2)),
+    3: ("tetragonal", (0, 2), (0, 2)),
+    4: ("rhombohedral", (0, 3), (0, 3)),
+    5: ("hexagonal", (0, 2), (0, 2)),
+    6: ("cubic", (0,), (0,)),
+}
+
+
 class UnitCell:
     """
     Storage class for the lattice vectors of a crystal i.e. its unit cell.
@@ -19,6 +67,19 @@ class UnitCell:
         lattice (np.ndarray): an alias for `direct`
     """
 
+    __slots__ = (
+        "direct",
+        "inverse",
+        "_reciprocal",
+        "lengths",
+        "angles",
+        "_angles_deg",
+        "cell_type",
+        "cell_type_index",
+        "unique_parameters",
+        "unique_parameters_deg",
+    )
+
     def __init__(self, vectors):
         """
         Create a UnitCell object from a list of lattice vectors or
@@ -39,7 +100,7 @@ class UnitCell:
     @property
     def reciprocal_lattice(self) -> np.ndarray:
         "The reciprocal matrix of this unit cell i.e. vectors of the reciprocal lattice"
-        return self.inverse.T
+        return self._reciprocal
 
     @property
     def direct_homogeneous(self) -> np.ndarray:
@@ -48,7 +109,7 @@ class UnitCell:
         T[:3, :3] = self.direct
         return T
 
-    def to_cartesian(self, coords: np.ndarray) -> np.ndarray:
+    def to_cartesian(self, coords: np.ndarray, out=None) -> np.ndarray:
         """
         Transform coordinates from fractional space (a, b, c)
         to Cartesian space (x, y, z). The x-direction will be aligned
@@ -56,13 +117,15 @@ class UnitCell:
 
         Args:
             coords (array_like): (N, 3) array of fractional coordinates
+            out (np.ndarray, optional): C-contiguous (N, 3) float64 array to
+                store the result in, to avoid allocating a new one
 
         Returns:
             np.ndarray: (N, 3) array of Cartesian coordinates
         """
-        return np.dot(coords, self.direct)
+        return np.dot(coords, self.direct, out=out)
 
-    def to_fractional(self, coords: np.ndarray) -> np.ndarray:
+    def to_fractional(self, coords: np.ndarray, out=None) -> np.ndarray:
         """
         Transform coordinates from Cartesian space (x, y, z)
         to fractional space (a, b, c). The x-direction will is assumed
@@ -70,11 +133,13 @@ class UnitCell:
 
         Args:
             coords (array_like): an (N, 3) array of Cartesian coordinates
+            out (np.ndarray, optional): C-contiguous (N, 3) float64 array to
+                store the result in, to avoid allocating a new one
 
         Returns:
             np.ndarray: (N, 3) array of fractional coordinates
         """
-        return np.dot(coords, self.inverse)
+        return np.dot(coords, self.inverse, out=out)
 
     def set_lengths_and_angles(self, lengths, angles):
         """
@@ -87,26 +152,33 @@ class UnitCell:
             angles (array_like): array of (alpha, beta, gamma), the unit cell angles lengths
                 in radians.
         """
-        self.lengths = lengths
-        self.angles = angles
-        a, b, c = self.lengths
-        ca, cb, cg = np.cos(self.angles)
-        sg = np.sin(self.angles[2])
-        v = self.volume()
-        self.direct = np.array((
-            (a, 0, 0),
-            (b * cg, b * sg, 0),
-            (c * cb, c * (ca - cb * cg) / sg, v / (a * b * sg))
-        ))
-        self.inverse = np.array((
-            (1.0 / a, 0.0, 0.0),
-            (-cg / (a * sg), 1 / (b * sg), 0),
-            (
-                b * c * (ca * cg - cb) / v / sg,
-                a * c * (cb * cg - ca) / v / sg,
-                a * b * sg / v,
-            )
-        ))
+        self.lengths = np.array(lengths, dtype=np.float64)
+        self.angles = np.array(angles, dtype=np.float64)
+        self._angles_deg = np.degrees(self.angles)
+        # plain float arithmetic, this is too small to benefit from numpy
+        a, b, c = self.lengths.tolist()
+        alpha, beta, gamma = self.angles.tolist()
+        ca, cb, cg = math.cos(alpha), math.cos(beta), math.cos(gamma)
+        sg = math.sin(gamma)
+        v = _cell_volume(a, b, c, ca, cb, cg)
+        # both matrices are lower triangular, fill them in place
+        direct = np.zeros((3, 3))
+        direct[0, 0] = a
+        direct[1, 0] = b * cg
+        direct[1, 1] = b * sg
+        direct[2, 0] = c * cb
+        direct[2, 1] = c * (ca - cb * cg) / sg
+        direct[2, 2] = v / (a * b * sg)
+        inverse = np.zeros((3, 3))
+        inverse[0, 0] = 1.0 / a
+        inverse[1, 0] = -cg / (a * sg)
+        inverse[1, 1] = 1 / (b * sg)
+        inverse[2, 0] = b * c * (ca * cg - cb) / v / sg
+        inverse[2, 1] = a * c * (cb * cg - ca) / v / sg
+        inverse[2, 2] = a * b * sg / v
+        self.direct = direct
+        self.inverse = inverse
+        self._reciprocal = np.ascontiguousarray(inverse.T)
         self._set_cell_type()
 
     def set_vectors(self, vectors):
@@ -124,102 +196,97 @@ class UnitCell:
             vectors (array_like): (3, 3) array of lattice vectors, row major i.e. vectors[0, :] is
                 lattice vector A etc.
         """
-        self.direct = vectors
-        params = zeros(6)
-        a, b, c = np.linalg.norm(self.direct, axis=1)
-        u_a = vectors[0, :] / a
-        u_b = vectors[1, :] / b
-        u_c = vectors[2, :] / c
-        alpha = np.arccos(np.clip(np.vdot(u_b, u_c), -1, 1))
-        beta = np.arccos(np.clip(np.vdot(u_c, u_a), -1, 1))
-        gamma = np.arccos(np.clip(np.vdot(u_a, u_b), -1, 1))
-        params[3:] = np.degrees([alpha, beta, gamma])
-        self.lengths = [a, b, c]
-        self.angles = [alpha, beta, gamma]
-        self.inverse = np.linalg.inv(self.direct)
+        # contiguous float64 so to_cartesian etc. go straight to BLAS
+        self.direct = np.ascontiguousarray(vectors, dtype=np.float64)
+        v_a, v_b, v_c = self.direct.tolist()
+        a, b, c = (math.sqrt(x * x + y * y + z * z) for x, y, z in (v_a, v_b, v_c))
+        u_a = [x / a for x in v_a]
+        u_b = [x / b for x in v_b]
+        u_c = [x / c for x in v_c]
+        alpha = _angle_between(u_b, u_c)
+        beta = _angle_between(u_c, u_a)
+        gamma = _angle_between(u_a, u_b)
+        self.lengths = np.array((a, b, c), dtype=np.float64)
+        self.angles = np.array((alpha, beta, gamma), dtype=np.float64)
+        self._angles_deg = np.degrees(self.angles)
+        self.inverse = _inverse_3x3(self.direct)
+        self._reciprocal = np.ascontiguousarray(self.inverse.T)
         self._set_cell_type()
 
     def _set_cell_type(self):
-        if self.is_cubic:
-            self.cell_type_index = 6
-            self.cell_type = "cubic"
-            self.unique_parameters = (self.a,)
-            self.unique_parameters_deg = self.unique_parameters
-        elif self.is_rhombohedral:
-            self.cell_type_index = 4
-            self.cell_type = "rhombohedral"
-            self.unique_parameters = self.a, self.alpha
-            self.unique_parameters_deg = (self.a, np.degrees(self.alpha))
-        elif self.is_hexagonal:
-            self.cell_type_index = 5
-            self.cell_type = "hexagonal"
-            self.unique_parameters = self.a, self.c
-            self.unique_parameters_deg = self.unique_parameters
-        elif self.is_tetragonal:
-            self.cell_type_index = 3
-            self.cell_type = "tetragonal"
-            self.unique_parameters = self.a, self.c
-            self.unique_parameters_deg = self.unique_parameters
-        elif self.is_orthorhombic:
-            self.cell_type_index = 2
-            self.cell_type = "orthorhombic"
-            self.unique_parameters = self.a, self.b, self.c
-            self.unique_parameters_deg = self.unique_parameters
-        elif self.is_monoclinic:
-            self.cell_type_index = 1
-            self.cell_type = "monoclinic"
-            self.unique_parameters = self.a, self.b, self.c, self.beta
-            self.unique_parameters_deg = (self.a, self.b, np.degrees(self.beta))
+        # evaluate the shared predicates once here, rather than through
+        # the is_* properties which recompute them for every check
+        a, b, c = self.lengths
+        alpha, beta, gamma = self.angles
+        right = np.pi / 2
+        ab, ac, bc = _close(a, b), _close(a, c), _close(b, c)
+        abc_equal = abs(b - a) <= 1e-8 and abs(c - a) <= 1e-8
+        abc_different = not (ab or ac or bc)
+        orthogonal = all(abs(abs(x) - right) <= 1e-8 for x in (alpha, beta, gamma))
+        if abc_equal and orthogonal:
+            index = 6
+        elif (
+            abc_equal
+            and abs(beta - alpha) <= 1e-8
+            and abs(gamma - alpha) <= 1e-8
+            and not _close(alpha, right)
+        ):
+            index = 4
+        elif (
+            ab
+            and not ac
+            and _close(alpha, right)
+            and _close(beta, right)
+            and _close(gamma, 2 * np.pi / 3)
+        ):
+            index = 5
+        elif ab and not ac and orthogonal:
+            index = 3
+        elif orthogonal and abc_different:
+            index = 2
+        elif _close(alpha, gamma) and abc_different:
+            index = 1
         else:
-            self.cell_type_index = 0
-            self.cell_type = "triclinic"
-            self.unique_parameters = (
-                self.a,
-                self.b,
-                self.c,
-                self.alpha,
-                self.beta,
-                self.gamma,
-            )
-            self.unique_parameters_deg = (
-                self.a,
-                self.b,
-                self.c,
-                np.degrees(self.alpha),
-                np.degrees(self.beta),
-                np.degrees(self.gamma),
-            )
+            index = 0
+        name, unique, unique_deg = _CELL_TYPES[index]
+        params = (a, b, c, alpha, beta, gamma)
+        params_deg = (a, b, c, *self._angles_deg)
+        self.cell_type_index = index
+        self.cell_type = name
+        self.unique_parameters = tuple(params[i] for i in unique)
+        self.unique_parameters_deg = tuple(params_deg[i] for i in unique_deg)
 
     def volume(self) -> float:
         """The volume of the unit cell, in cubic Angstroms"""
-        a, b, c = self.lengths
-        ca, cb, cg = np.cos(self.angles)
-        return a * b * c * np.sqrt(1 - ca * ca - cb * cb - cg * cg + 2 * ca * cb * cg)
+        a, b, c = self.lengths.tolist()
+        alpha, beta, gamma = self.angles.tolist()
+        return _cell_volume(
+            a, b, c, math.cos(alpha), math.cos(beta), math.cos(gamma)
+        )
 
     @property
     def abc_equal(self) -> bool:
         "are the lengths a, b, c all equal?"
-        return close(np.array(self.lengths) - self.lengths[0], zeros(3))
+        a, b, c = self.lengths
+        return abs(b - a) <= 1e-8 and abs(c - a) <= 1e-8
 
     @property
     def abc_different(self) -> bool:
         "are all of the lengths a, b, c different?"
-        return not (
-            close(self.a, self.b) or close(self.a, self.c) or close(self.b, self.c)
-        )
+        a, b, c = self.lengths
+        return not (_close(a, b) or _close(a, c) or _close(b, c))
 
     @property
     def orthogonal(self) -> bool:
         "returns true if the lattice vectors are orthogonal"
-        return close(np.abs(self.angles) - np.pi / 2, zeros(3))
+        return all(abs(abs(x) - np.pi / 2) <= 1e-8 for x in self.angles)
 
     @property
     def angles_different(self) -> bool:
         "are all of the angles alpha, beta, gamma different?"
+        alpha, beta, gamma = self.angles
         return not (
-            close(self.alpha, self.beta)
-            or close(self.alpha, self.gamma)
-            or close(self.beta, self.gamma)
+            _close(alpha, beta) or _close(alpha, gamma) or _close(beta, gamma)
         )
 
     @property
@@ -230,7 +297,7 @@ class UnitCell:
     @property
     def is_monoclinic(self) -> bool:
         """Returns true if angles alpha and gamma are equal"""
-        return close(self.alpha, self.gamma) and self.abc_different
+        return _close(self.alpha, self.gamma) and self.abc_different
 
     @property
     def is_cubic(self) -> bool:
@@ -245,25 +312,28 @@ class UnitCell:
     @property
     def is_tetragonal(self) -> bool:
         """Returns true if a, b are equal and all angles are 90 degrees"""
-        return close(self.a, self.b) and (not close(self.a, self.c)) and self.orthogonal
+        return _close(self.a, self.b) and (not _close(self.a, self.c)) and self.orthogonal
 
     @property
     def is_rhombohedral(self) -> bool:
         """Returns true if all lengths are equal and all angles are equal"""
+        alpha, beta, gamma = self.angles
         return (
             self.abc_equal
-            and close(np.array(self.angles) - self.angles[0], zeros(3))
-            and (not close(self.alpha, np.pi / 2))
+            and abs(beta - alpha) <= 1e-8
+            and abs(gamma - alpha) <= 1e-8
+            and (not _close(alpha, np.pi / 2))
         )
 
     @property
     def is_hexagonal(self) -> bool:
         """Returns true if lengths a == b, a != c, alpha and beta == 90 and gamma == 120"""
         return (
-            close(self.a, self.b)
-            and (not close(self.a, self.c))
-            and close(self.angles[:2], np.pi / 2)
-            and close(self.gamma, 2 * np.pi / 3)
+            _close(self.a, self.b)
+            and (not _close(self.a, self.c))
+            and _close(self.alpha, np.pi / 2)
+            and _close(self.beta, np.pi / 2)
+            and _close(self.gamma, 2 * np.pi / 3)
         )
 
     @property
@@ -279,12 +349,12 @@ class UnitCell:
     @property
     def v_a_star(self) -> np.ndarray:
         "reciprocal lattice vector a*"
-        return self.inverse[:, 0]
+        return self._reciprocal[0]
 
     @property
     def a_star(self) -> float:
         "length of reciprocal lattice vector a*"
-        return self.b * self.c * np.sin(self.alpha) / self.volume()
+        return self.b * self.c * math.sin(self.alpha) / self.volume()
 
     @property
     def alpha(self) -> float:
@@ -312,12 +382,12 @@ class UnitCell:
     @property
     def v_b_star(self) -> np.ndarray:
         "reciprocal lattice vector b*"
-        return self.inverse[:, 1]
+        return self._reciprocal[1]
 
     @property
     def b_star(self) -> float:
         "length of reciprocal lattice vector b*"
-        return self.a * self.c * np.sin(self.beta) / self.volume()
+        return self.a * self.c * math.sin(self.beta) / self.volume()
 
     @property
     def beta(self) -> float:
@@ -345,12 +415,12 @@ class UnitCell:
     @property
     def v_c_star(self) -> np.ndarray:
         "reciprocal lattice vector c*"
-        return self.inverse[:, 2]
+        return self._reciprocal[2]
 
     @property
     def c_star(self) -> float:
         "length of reciprocal lattice vector c*"
-        return self.a * self.b * np.sin(self.gamma) / self.volume()
+        return self.a * self.b * math.sin(self.gamma) / self.volume()
 
     @property
     def gamma(self) -> float:
@@ -368,30 +438,30 @@ class UnitCell:
     @property
     def alpha_deg(self) -> float:
         "Angle between lattice vectors b and c in degrees"
-        return np.degrees(self.angles[0])
+        return self._angles_deg[0]
 
     @property
     def beta_deg(self) -> float:
         "Angle between lattice vectors a and c in degrees"
-        return np.degrees(self.angles[1])
+        return self._angles_deg[1]
 
     @property
     def gamma_deg(self) -> float:
         "Angle between lattice vectors a and b in degrees"
-        return np.degrees(self.angles[2])
+        return self._angles_deg[2]
 
     @property
     def parameters(self) -> np.ndarray:
         "single vector of lattice side lengths and angles in degrees"
-        atol = 1e-6
-        l = np.array(self.lengths)
-        deg = np.degrees(self.angles)
-        len_diffs = np.abs(l[:, np.newaxis] - l[np.newaxis, :]) < atol
-        ang_diffs = np.abs(deg[:, np.newaxis] - deg[np.newaxis, :]) < atol
-        for i in range(3):
-            l[len_diffs[i]] = l[i]
-            deg[ang_diffs[i]] = deg[i]
-        return np.hstack((l, deg))
+        # snap lengths (and angles) equal within tolerance to the same value
+        params = self.lengths.tolist() + self._angles_deg.tolist()
+        original = list(params)
+        for offset in (0, 3):
+            for i in range(offset, offset + 3):
+                for j in range(offset, offset + 3):
+                    if abs(original[i] - original[j]) < 1e-6:
+                        params[j] = params[i]
+        return np.array(params)
 
     @classmethod
     def from_lengths_and_angles(cls, lengths, angles, unit="radians"):
@@ -418,6 +488,69 @@ class UnitCell:
             uc.set_lengths_and_angles(lengths, np.radians(angles))
         return uc
 
+    @classmethod
+    def from_lengths_and_angles_batched(cls, lengths, angles, unit="radians"):
+        """
+        Construct many UnitCells at once from the provided lengths and angles,
+        equivalent to calling `from_lengths_and_angles` for each row but with
+        the trigonometry and matrix assembly done once for the whole batch.
+
+        Args:
+            lengths (array_like): (N, 3) array of lattice side lengths (a, b, c) in Angstroms.
+            angles (array_like): (N, 3) array of lattice angles (alpha, beta, gamma)
+                in provided units (default radians)
+            unit (str, optional): Unit for angles i.e. 'radians' or 'degrees' (default radians).
+
+        Returns:
+            List[UnitCell]: N new unit cell objects, in the same order as the inputs.
+        """
+        lengths = np.array(lengths, dtype=np.float64).reshape(-1, 3)
+        angles = np.array(angles, dtype=np.float64).reshape(-1, 3)
+        if unit == "radians":
+            if np.any(np.abs(angles) > np.pi):
+                LOG.warn(
+                    "Large angle in UnitCell.from_lengths_and_angles_batched, "
+                    "are you sure your angles are not in degrees?"
+                )
+        else:
+            angles = np.radians(angles)
+        n = lengths.shape[0]
+        a, b, c = lengths.T
+        ca, cb, cg = np.cos(angles).T
+        sg = np.sin(angles[:, 2])
+        x = 1 - ca * ca - cb * cb - cg * cg + 2 * ca * cb * cg
+        with np.errstate(invalid="ignore"):
+            v = a * b * c * np.sqrt(x)
+        # same lower triangular matrices as set_lengths_and_angles
+        direct = np.zeros((n, 3, 3))
+        direct[:, 0, 0] = a
+        direct[:, 1, 0] = b * cg
+        direct[:, 1, 1] = b * sg
+        direct[:, 2, 0] = c * cb
+        direct[:, 2, 1] = c * (ca - cb * cg) / sg
+        direct[:, 2, 2] = v / (a * b * sg)
+        inverse = np.zeros((n, 3, 3))
+        inverse[:, 0, 0] = 1.0 / a
+        inverse[:, 1, 0] = -cg / (a * sg)
+        inverse[:, 1, 1] = 1 / (b * sg)
+        inverse[:, 2, 0] = b * c * (ca * cg - cb) / v / sg
+        inverse[:, 2, 1] = a * c * (cb * cg - ca) / v / sg
+        inverse[:, 2, 2] = a * b * sg / v
+        reciprocal = np.ascontiguousarray(inverse.transpose(0, 2, 1))
+        angles_deg = np.degrees(angles)
+        cells = []
+        for i in range(n):
+            uc = cls.__new__(cls)
+            uc.lengths = lengths[i]
+            uc.angles = angles[i]
+            uc._angles_deg = angles_deg[i]
+            uc.direct = direct[i]
+            uc.inverse = inverse[i]
+            uc._reciprocal = reciprocal[i]
+            uc._set_cell_type()
+            cells.append(uc)
+        return cells
+
     @classmethod
     def cubic(cls, length):
         """
@@ -429,7 +562,7 @@ class UnitCell:
         Returns:
             UnitCell: A new unit cell object representing the provided lattice.
         """
-        return cls(np.eye(3) * length)
+        return cls._from_diagonal((length, length, length))
 
     @classmethod
     def from_unique_parameters(cls, params, cell_type="triclinic", **kwargs):
@@ -549,7 +682,23 @@ class UnitCell:
         """
 
         assert len(lengths) == 3, "Requre three lengths for Orthorhombic cell"
-        return cls(np.diag(lengths))
+        return cls._from_diagonal(lengths)
+
+    @classmethod
+    def _from_diagonal(cls, lengths):
+        "Construct a UnitCell with orthogonal lattice vectors along x, y, z"
+        # equivalent to cls(np.diag(lengths)), but the inverse and
+        # angles of a diagonal lattice are known without computing them
+        lengths = np.array(lengths, dtype=np.float64)
+        uc = cls.__new__(cls)
+        uc.direct = np.diag(lengths)
+        uc.inverse = np.diag(1.0 / lengths)
+        uc._reciprocal = uc.inverse.copy()
+        uc.lengths = np.abs(lengths)
+        uc.angles = np.full(3, np.pi / 2)
+        uc._angles_deg = np.degrees(uc.angles)
+        uc._set_cell_type()
+        return uc
 
     def as_rhombohedral(
         self, T=((-1 / 3, 1 / 3, 1 / 3), (2 / 3, 1 / 3, 1 / 3), (-1 / 3, -2 / 3, 1 / 3))
@@ -227,7 +227,7 @@ class Cif:
             self.current_data_block[k] = []
 
         for value in values:
-            vs = re.findall(VALUES_REGEX, value.strip())
+            vs = VALUES_REGEX.findall(value.strip())
             for k, v in zip(keys, vs):
                 self.current_data_block[k].append(parse_value(v))
         LOG.debug("Parsed loop block")
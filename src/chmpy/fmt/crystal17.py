@@ -7,13 +7,16 @@ import logging
 
 LOG = logging.getLogger(__name__)
 CRYSTAL17_TEMPLATE = load_template("crystal17")
+# format strings for 1-6 unique cell parameters
+_CELL_PARAMETER_FORMATS = {n: " ".join(["%10.6f"] * n) for n in range(1, 7)}
 
 
 def to_crystal17_input(crystal, **kwargs):
     space_group = crystal.space_group.international_tables_number
+    lattice_type = crystal.space_group.lattice_type
     params = (
         crystal.uc.parameters
-        if crystal.space_group.lattice_type == "triclinic"
+        if lattice_type == "triclinic"
         else crystal.uc.unique_parameters_deg
     )
     method = kwargs.get("method", "hf-3c")
@@ -26,10 +29,10 @@ def to_crystal17_input(crystal, **kwargs):
         "basis_set_keywords": kwargs.get("basis_set_keywords", {}),
         "shrink_factors": kwargs.get("shrink_factors", (4, 4)),
         "iflag": kwargs.get("iflag", 0),
-        "ifhr": 1 if crystal.space_group.lattice_type == "rhombohedral" else 0,
+        "ifhr": 1 if lattice_type == "rhombohedral" else 0,
         "ifso": 0,  # change of origin
         "space_group": space_group,
-        "cell_parameters": " ".join(f"{x:10.6f}" for x in params),
+        "cell_parameters": _CELL_PARAMETER_FORMATS[len(params)] % tuple(params),
         "basis_set": kwargs.get("basis_set", "cc-pVDZ"),
     }
     return CRYSTAL17_TEMPLATE.render(
@@ -42,10 +45,14 @@ def to_crystal17_input(crystal, **kwargs):
 
 
 def load_crystal17_output_string(string):
-    total_energy_line = ""
-    for line in string.splitlines():
-        if "TOTAL ENERGY" in line:
-            total_energy_line = line
+    # only the last TOTAL ENERGY line is needed, so search backwards
+    # rather than splitting the whole output into lines
+    idx = string.rfind("TOTAL ENERGY")
+    if idx < 0:
+        raise ValueError("Could not find TOTAL ENERGY in CRYSTAL17 output")
+    start = string.rfind("\n", 0, idx) + 1
+    end = string.find("\n", idx)
+    total_energy_line = string[start : end if end >= 0 else None]
     energy = float(total_energy_line.split(")")[-1].split()[0])
     return energy
 
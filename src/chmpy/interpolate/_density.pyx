@@ -13,6 +13,10 @@ _INTERPOLATOR_DATA = np.load(join(_DATA_DIR, "thakkar_interp.npz"))
 _DOMAIN = _INTERPOLATOR_DATA.f.domain
 _RHO = _INTERPOLATOR_DATA.f.rho
 _GRAD_RHO = _INTERPOLATOR_DATA.f.grad_rho
+# number of points evaluated together per atom in evaluate_rho,
+# 1024 points with their densities is 16 KiB
+cdef enum:
+    RHO_TILE_SIZE = 1024
 
 
 @cython.final
@@ -21,52 +25,131 @@ cdef class PromoleculeDensity:
     cdef public int[::1] elements
     cdef const float[::1] domain
     cdef const float[:, ::1] rho_data
+    cdef const int[::1] table
+    cdef float lbound, inv_dx
 
-    def __init__(self, pos, const float[::1] domain, const float[:, ::1] rho_data):
+    def __init__(self, pos, const float[::1] domain, const float[:, ::1] rho_data, table=None):
         self.positions = pos
         self.domain = domain
+        # rho_data holds one interpolation table per element, shared by
+        # every atom of that element: table[i] is the row for atom i
         self.rho_data = rho_data
+        if table is None:
+            table = np.arange(rho_data.shape[0], dtype=np.int32)
+        self.table = table
+        # the domain is uniformly spaced, so the interpolation index
+        # is a multiply away; keep the constants for the hot loops
+        self.lbound = domain[0]
+        self.inv_dx = 1.0 / (domain[1] - domain[0])
 
 
     def rho(self, pts):
-        r = np.empty(pts.shape[0], dtype=np.float32)
-        rho = np.zeros(pts.shape[0], dtype=np.float32)
-        tmp = np.empty(pts.shape[0], dtype=np.float32)
-        self.evaluate_rho(pts, rho, tmp, r)
+        rho = np.empty(pts.shape[0], dtype=np.float32)
+        self.evaluate_rho(pts, rho)
         return rho
 
-    cdef void evaluate_rho(self, const float[:, ::1] pts, float[::1] rho_view, float[::1] tmp_view, float[::1] r_view) noexcept nogil:
-        cdef int i, j, col
-        cdef float diff
-        cdef float[3] pos
+    @cython.cdivision(True)
+    cdef void evaluate_rho(self, const float[:, ::1] pts, float[::1] rho_view) noexcept nogil:
+        # the points are processed in tiles, parallel over tiles, with the
+        # atoms in the outer loop of each tile: neighbouring points look up
+        # nearby entries of the same atom's table row, so those rows stay in
+        # cache. Every point still sums its atoms in order, with no temporaries
+        cdef int i, j, k, tile, j0, j1, row
+        cdef float r, diff, t, contrib, px, py, pz
         cdef const float[:, ::1] pos_view = self.positions
         cdef const float[:, ::1] rho_data_view = self.rho_data
-        cdef const float[::1] domain_view = self.domain
+        cdef const int[::1] table = self.table
+        cdef const float[::1] xi = self.domain
+        cdef int npos = self.positions.shape[0]
+        cdef int npts = pts.shape[0]
+        cdef int ni = xi.shape[0]
+        cdef float lbound = self.lbound
+        cdef float inv_dx = self.inv_dx
+        cdef int ntiles = (npts + RHO_TILE_SIZE - 1) // RHO_TILE_SIZE
+        for tile in prange(ntiles, schedule="static"):
+            j0 = tile * RHO_TILE_SIZE
+            j1 = j0 + RHO_TILE_SIZE
+            if j1 > npts:
+                j1 = npts
+            for j in range(j0, j1):
+                rho_view[j] = 0.0
+            for i in range(npos):
+                px = pos_view[i, 0]
+                py = pos_view[i, 1]
+                pz = pos_view[i, 2]
+                row = table[i]
+                for j in range(j0, j1):
+                    r = 0.0
+                    diff = pts[j, 0] - px
+                    r = r + diff * diff
+                    diff = pts[j, 1] - py
+                    r = r + diff * diff
+                    diff = pts[j, 2] - pz
+                    r = r + diff * diff
+                    r = r / (0.5291772108 * 0.5291772108) # bohr_per_angstrom
+                    k = <int>(inv_dx * (r - lbound))
+                    if k <= 0:
+                        contrib = rho_data_view[row, 0]
+                    elif k >= ni - 1:
+                        contrib = rho_data_view[row, ni - 1]
+                    else:
+                        t = (r - xi[k]) * inv_dx
+                        contrib = (1.0 - t) * rho_data_view[row, k] + t * rho_data_view[row, k + 1]
+                    rho_view[j] += contrib
+
+    def rho_or_fill(self, pts, float cutoff, float fill):
+        """Density at each point, or `fill` for points within `cutoff`
+        (angstroms) of any atom."""
+        rho = np.empty(pts.shape[0], dtype=np.float32)
+        self.evaluate_rho_or_fill(pts, cutoff, fill, rho)
+        return rho
+
+    @cython.cdivision(True)
+    cdef void evaluate_rho_or_fill(self, const float[:, ::1] pts, float cutoff,
+                                   float fill, float[::1] rho_view) noexcept nogil:
+        cdef int i, j, k, row
+        cdef float r, diff, t, contrib, total
+        cdef const float[:, ::1] pos_view = self.positions
+        cdef const float[:, ::1] rho_data_view = self.rho_data
+        cdef const int[::1] table = self.table
+        cdef const float[::1] xi = self.domain
         cdef int npos = self.positions.shape[0]
         cdef int npts = pts.shape[0]
-        for i in range(npos):
-            pos[0] = pos_view[i, 0]
-            pos[1] = pos_view[i, 1]
-            pos[2] = pos_view[i, 2]
-            for j in range(npts):
-                tmp_view[j] = 0.0
-                r_view[j] = (
-                    (pts[j, 0] - pos[0]) * (pts[j, 0] - pos[0]) + 
-                    (pts[j, 1] - pos[1]) * (pts[j, 1] - pos[1]) + 
-                    (pts[j, 2] - pos[2]) * (pts[j, 2] - pos[2])
-                )
-                r_view[j] = r_view[j] / (0.5291772108 * 0.5291772108) # bohr_per_angstrom
-            interp_f(r_view, domain_view, rho_data_view[i], tmp_view)
-            for j in range(pts.shape[0]):
-                rho_view[j] += tmp_view[j]
+        cdef int ni = xi.shape[0]
+        cdef float lbound = self.lbound
+        cdef float inv_dx = self.inv_dx
+        cdef float cutoff2 = cutoff * cutoff
+        for j in prange(npts, schedule="guided"):
+            total = 0.0
+            for i in range(npos):
+                r = 0.0
+                diff = pts[j, 0] - pos_view[i, 0]
+                r = r + diff * diff
+                diff = pts[j, 1] - pos_view[i, 1]
+                r = r + diff * diff
+                diff = pts[j, 2] - pos_view[i, 2]
+                r = r + diff * diff
+                if r <= cutoff2:
+                    total = fill
+                    break
+                r = r / (0.5291772108 * 0.5291772108) # bohr_per_angstrom
+                k = <int>(inv_dx * (r - lbound))
+                row = table[i]
+                if k <= 0:
+                    contrib = rho_data_view[row, 0]
+                elif k >= ni - 1:
+                    contrib = rho_data_view[row, ni - 1]
+                else:
+                    t = (r - xi[k]) * inv_dx
+                    contrib = (1.0 - t) * rho_data_view[row, k] + t * rho_data_view[row, k + 1]
+                total = total + contrib
+            rho_view[j] = total
 
     cdef float one_rho(self, const float position[3]) noexcept nogil:
-        cdef int i
+        cdef int i, col
         cdef int N = self.positions.shape[0]
+        cdef int ni = self.domain.shape[0]
         cdef float diff, r
-        cdef const float[::1] pos
-        cdef const float[::1] xi = self.domain
-        cdef const float[::1] yi
         cdef const float[:, ::1] pos_view = self.positions
         cdef const float[:, ::1] rho_data_view = self.rho_data
         cdef float rho = 0.0
@@ -76,7 +159,9 @@ cdef class PromoleculeDensity:
                 diff = position[col] - pos_view[i, col]
                 r += diff*diff
             r = r / (0.5291772108 * 0.5291772108) # bohr_per_angstrom
-            rho += interp_f_one(r, xi, rho_data_view[i])
+            rho += interp_f_one(
+                r, &self.domain[0], &rho_data_view[self.table[i], 0], ni, self.lbound, self.inv_dx
+            )
         return rho
 
 @cython.final
@@ -102,48 +187,15 @@ cdef class StockholderWeight:
 
 
 @cython.cdivision(True)
-cdef void interp_f(const float[::1] x, const float[::1] xi,
-                   const float[::1] yi, float[::1] y) noexcept nogil:
-
-    cdef int ni = xi.shape[0]
-    cdef float lbound = xi[0]
-    cdef float ubound = xi[ni - 1]
-    cdef float ufill = yi[ni - 1]
-    cdef float lfill = yi[0]
-    cdef float dx = xi[1] - xi[0]
-    cdef float inv_dx = 1.0 / dx
-    cdef int i, j
-    cdef float t
-
-    for i in prange(x.shape[0]):
-        j = <int>(inv_dx * (x[i] - lbound))
-        if j <= 0:
-            y[i] = lfill
-        elif j >= ni - 1:
-            y[i] = ufill
-        else:
-            t = (x[i] - xi[j]) * inv_dx 
-            y[i] = (1.0 - t) * yi[j] + t * yi[j + 1]
-
-@cython.cdivision(True)
-cdef inline float interp_f_one(const float x, const float[::1] xi,
-                               const float[::1] yi) noexcept nogil:
-
-    cdef int ni = xi.shape[0]
-    cdef float lbound = xi[0]
-    cdef float ubound = xi[ni - 1]
-    cdef float ufill = 0.0
-    cdef float lfill = yi[0]
-    cdef float dx = xi[1] - xi[0]
-    cdef float inv_dx = 1.0 / dx
-    cdef int j
+cdef inline float interp_f_one(const float x, const float *xi, const float *yi,
+                               const int ni, const float lbound,
+                               const float inv_dx) noexcept nogil:
+    cdef int j = <int>(inv_dx * (x - lbound))
     cdef float t
-
-    j = <int>(inv_dx * (x - lbound))
     if j <= 0:
-        return lfill
+        return yi[0]
     elif j >= ni - 1:
-        return ufill
+        return 0.0
     else:
         t = (x - xi[j]) * inv_dx 
         return (1.0 - t) * yi[j] + t * yi[j + 1]
@@ -290,7 +342,6 @@ cpdef sphere_promolecule_radii(
         const float l, const float u, const float tol, const int max_iter,
         const float isovalue):
     cdef int i, N = grid.shape[0]
-    cdef float d[3]
     cdef float o[3]
     r = np.empty(N, dtype=np.float64)
     cdef double[::1] rview  = r
@@ -298,21 +349,32 @@ cpdef sphere_promolecule_radii(
     o[1] = origin[1]
     o[2] = origin[2]
     
-    with nogil:
-        for i in range(N):
-            d[0] = grid[i, 0]
-            d[1] = grid[i, 1]
-            d[2] = grid[i, 2]
-            rview[i] = brents_pro(s, o, d, l, u, tol, max_iter, isovalue)
+    # each direction is an independent root find
+    for i in prange(N, nogil=True, schedule="static"):
+        rview[i] = brents_pro(s, o, &grid[i, 0], l, u, tol, max_iter, isovalue)
     return r
 
 
+@cython.cdivision(True)
+cpdef sphere_promolecule_radii_batch(
+        PromoleculeDensity s, const float[:, ::1] origins, const float[:, ::1] grid,
+        const float l, const float u, const float tol, const int max_iter,
+        const float isovalue):
+    cdef int k, M = origins.shape[0], N = grid.shape[0]
+    r = np.empty((M, N), dtype=np.float64)
+    cdef double[:, ::1] rview  = r
+
+    for k in prange(M * N, nogil=True, schedule="static"):
+        rview[k // N, k % N] = brents_pro(
+            s, &origins[k // N, 0], &grid[k % N, 0], l, u, tol, max_iter, isovalue
+        )
+    return r
+
 
 cpdef sphere_stockholder_radii(
         StockholderWeight s, const float[::1] origin, const float[:, ::1] grid,
         const float l, const float u, const float tol, const int max_iter, const float isovalue):
     cdef int i, N = grid.shape[0]
-    cdef float d[3]
     cdef float o[3]
     r = np.empty(N, dtype=np.float64)
     cdef double[::1] rview  = r
@@ -320,10 +382,22 @@ cpdef sphere_stockholder_radii(
     o[1] = origin[1]
     o[2] = origin[2]
     
-    with nogil:
-        for i in range(N):
-            d[0] = grid[i, 0]
-            d[1] = grid[i, 1]
-            d[2] = grid[i, 2]
-            rview[i] = brents_stock(s, o, d, l, u, tol, max_iter, isovalue)
+    # each direction is an independent root find
+    for i in prange(N, nogil=True, schedule="static"):
+        rview[i] = brents_stock(s, o, &grid[i, 0], l, u, tol, max_iter, isovalue)
+    return r
+
+
+@cython.cdivision(True)
+cpdef sphere_stockholder_radii_batch(
+        StockholderWeight s, const float[:, ::1] origins, const float[:, ::1] grid,
+        const float l, const float u, const float tol, const int max_iter, const float isovalue):
+    cdef int k, M = origins.shape[0], N = grid.shape[0]
+    r = np.empty((M, N), dtype=np.float64)
+    cdef double[:, ::1] rview  = r
+
+    for k in prange(M * N, nogil=True, schedule="static"):
+        rview[k // N, k % N] = brents_stock(
+            s, &origins[k // N, 0], &grid[k % N, 0], l, u, tol, max_iter, isovalue
+        )
     return r
@@ -19,19 +19,33 @@ class PromoleculeDensity:
         self.positions = np.asarray(pos, dtype=np.float32)
         if np.any(self.elements < 1) or np.any(self.elements > 103):
             raise ValueError("All elements must be atomic numbers between [1,103]")
-        self.rho_data = np.empty(
-            (self.elements.shape[0], _DOMAIN.shape[0]), dtype=np.float32
+        # one interpolation table per distinct element, indexed per atom
+        uniq, table = np.unique(self.elements, return_inverse=True)
+        self.rho_data = _RHO[uniq - 1]
+        self.dens = cPromol(
+            self.positions, _DOMAIN, self.rho_data, table.astype(np.int32)
         )
-        for i, el in enumerate(self.elements):
-            self.rho_data[i, :] = _RHO[el - 1, :]
-        self.dens = cPromol(self.positions, _DOMAIN, self.rho_data)
-        self.principal_axes, _, _ = np.linalg.svd((self.positions - self.centroid).T)
         self.vdw_radii = vdw_radii(self.elements)
 
+    @property
+    def principal_axes(self):
+        # only the left singular vectors are needed, avoid the (N, N) right ones
+        if not hasattr(self, "_principal_axes"):
+            self._principal_axes, _, _ = np.linalg.svd(
+                (self.positions - self.centroid).T, full_matrices=self.natoms < 3
+            )
+        return self._principal_axes
+
     def rho(self, positions):
         positions = np.asarray(positions, dtype=np.float32)
         return self.dens.rho(positions)
 
+    def rho_or_fill(self, positions, cutoff=1.0, fill=1.0):
+        """Density at each position, or `fill` for positions within
+        `cutoff` angstroms of any atom."""
+        positions = np.ascontiguousarray(positions, dtype=np.float32)
+        return self.dens.rho_or_fill(positions, cutoff, fill)
+
     @property
     def centroid(self):
         return np.mean(self.positions, axis=0)
@@ -56,16 +70,17 @@ class PromoleculeDensity:
         pos = self.positions
         tree = KDTree(pos)
         # make sure k is enough should be enough for d_norm to be correct
-        dists, idxs = tree.query(positions, k=min(6, self.natoms))
-        d_norm = np.empty(dists.shape[0])
-        vecs = np.empty(positions.shape)
-        for j, (d, i) in enumerate(zip(dists, idxs)):
-            i = i[i < pos.shape[0]]
-            vdw = self.vdw_radii[i]
-            d_n = (d - vdw) / vdw
-            p = np.argmin(d_n)
-            d_norm[j] = d_n[p]
-            vecs[j] = (pos[p] - positions[j]) / vdw[p]
+        # one query per surface vertex, spread over all cores
+        dists, idxs = tree.query(positions, k=min(6, self.natoms), workers=-1)
+        # evaluate all vertices at once on the (N, k) query results
+        n = positions.shape[0]
+        vdw = self.vdw_radii[idxs.reshape(n, -1)]
+        d_n = (dists.reshape(n, -1) - vdw) / vdw
+        p = np.argmin(d_n, axis=1)
+        rows = np.arange(n)
+        d_norm = d_n[rows, p]
+        nearest = idxs.reshape(n, -1)[rows, p]
+        vecs = (pos[nearest] - positions) / vdw[rows, p][:, np.newaxis]
         if dists.ndim == 1:
             return dists, d_norm, vecs
         return dists[:, 0], d_norm, vecs
@@ -97,9 +112,8 @@ class StockholderWeight:
         return np.r_[self.dens_a.vdw_radii, self.dens_b.vdw_radii]
 
     def weights(self, positions):
-        pos = positions.astype(np.float32)
-        results = []
-        return self.s.weights(positions.astype(np.float32))
+        positions = np.asarray(positions, dtype=np.float32)
+        return self.s.weights(positions)
 
     def d_norm(self, positions):
         d_a, d_norm_a, vecs_a = self.dens_a.d_norm(positions)
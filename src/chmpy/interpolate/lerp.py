@@ -2,8 +2,6 @@ import numpy as np
 
 def vectorized_lerp(xs, xp, yp, l_fill=None, u_fill=None):
     N = xp.shape[0]
-    dx = xp[1] - xp[0]  # Assuming uniform spacing
-    inv_dx = 1.0 / dx
     l = xp[0]
     u = xp[-1]
     if l_fill is None:
@@ -12,11 +10,16 @@ def vectorized_lerp(xs, xp, yp, l_fill=None, u_fill=None):
     if u_fill is None:
         u_fill = yp[-1]
     
-    # Calculate js indices
-    js = np.minimum((inv_dx * (xs - l)).astype(np.int32), N - 2)
+    # Calculate js indices: directly for uniformly spaced xp,
+    # otherwise via binary search
+    dx = np.diff(xp)
+    if np.allclose(dx, dx[0], rtol=1e-12, atol=0):
+        js = np.clip(((xs - l) * (1.0 / dx[0])).astype(np.intp), 0, N - 2)
+    else:
+        js = np.clip(np.searchsorted(xp, xs, side="right") - 1, 0, N - 2)
     
     # Compute weights for interpolation
-    w = (xs - xp[js]) * inv_dx
+    w = (xs - xp[js]) / (xp[js + 1] - xp[js])
     
     # Linear interpolation
     results = (1.0 - w) * yp[js] + w * yp[js + 1]
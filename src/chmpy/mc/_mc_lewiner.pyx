@@ -957,7 +957,7 @@ cdef class LutProvider:
         self.SUBCONFIG13 = Lut(SUBCONFIG13)
 
 
-def marching_cubes(float [:, :, :] im not None, double isovalue, LutProvider luts, int st=1, int classic=0):
+def marching_cubes(float [:, :, ::1] im not None, double isovalue, LutProvider luts, int st=1, int classic=0):
     """ marching_cubes(im, double isovalue, LutProvider luts, int st=1, int classic=0)
     This is the main entry to apply marching cubes.
     Returns (vertices, faces, normals, values)
@@ -974,6 +974,7 @@ def marching_cubes(float [:, :, :] im not None, double isovalue, LutProvider lut
     cdef int x, y, z, x_st, y_st, z_st
     cdef int nt
     cdef int case, config, subconfig
+    cdef double v0, v1, v2, v3, v4, v5, v6, v7
 
     # Unfortunately specifying a step in range() significantly degrades
     # performance. Therefore we use a while loop.
@@ -1001,10 +1002,20 @@ def marching_cubes(float [:, :, :] im not None, double isovalue, LutProvider lut
                 x += st
                 x_st = x + st
 
+                v0, v1, v2, v3 = im[z   ,y, x], im[z   ,y, x_st], im[z   ,y_st, x_st], im[z   ,y_st, x]
+                v4, v5, v6, v7 = im[z_st,y, x], im[z_st,y, x_st], im[z_st,y_st, x_st], im[z_st,y_st, x]
+
+                # Cubes with every corner on the same side of the isovalue
+                # (index 0 or 255) contain no surface, skip them early
+                if (v0 > isovalue and v1 > isovalue and v2 > isovalue and v3 > isovalue and
+                    v4 > isovalue and v5 > isovalue and v6 > isovalue and v7 > isovalue):
+                    continue
+                if (v0 <= isovalue and v1 <= isovalue and v2 <= isovalue and v3 <= isovalue and
+                    v4 <= isovalue and v5 <= isovalue and v6 <= isovalue and v7 <= isovalue):
+                    continue
+
                 # Initialize cell
-                cell.set_cube(isovalue, x, y, z, st,
-                    im[z   ,y, x], im[z   ,y, x_st], im[z   ,y_st, x_st], im[z   ,y_st, x],
-                    im[z_st,y, x], im[z_st,y, x_st], im[z_st,y_st, x_st], im[z_st,y_st, x] )
+                cell.set_cube(isovalue, x, y, z, st, v0, v1, v2, v3, v4, v5, v6, v7)
 
                 # Do classic!
                 if classic:
@@ -3,4 +3,5 @@ from .sht import SHT
 from .shape_descriptors import (
     stockholder_weight_descriptor,
     promolecule_density_descriptor,
+    batch_promolecule_density_descriptor,
 )
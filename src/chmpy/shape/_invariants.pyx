@@ -152,7 +152,52 @@ cdef int coefficient_r(int l, int m) noexcept nogil:
     return (l+1)*(l+2)/2 - l + m - 1
 
 
-cdef double complex invariant_P_c(double complex[::1] coeffs, int l, int l1, int l2) noexcept nogil:
+# Clebsch-Gordan coefficients in the order the P invariants consume
+# them, keyed on (l_max, full) and built once per key. Evaluating the
+# Racah formula dominated the cost of the invariants otherwise.
+_CLEBSCH_TABLES = {}
+
+
+cdef inline bint valid_p_triple(int l, int l1, int l2) noexcept nogil:
+    if (l1 - l2 > l) or (l1 + l2  < l):
+        return False
+    return (((l % 2 == 0) or (l2 != l1)) and
+            ((l2 % 2 == 0) or (l1 != l)))
+
+
+cdef clebsch_table(int l_max, bint full):
+    key = (l_max, full)
+    table = _CLEBSCH_TABLES.get(key)
+    if table is not None:
+        return table
+    cdef int l, l1, l2, m, m1, m_lo, m1_lo
+    cdef Py_ssize_t n = 0
+    for l2 in range(1, l_max + 1):
+        for l1 in range(l2, l_max+1):
+            for l in range(l1, l_max+1):
+                if valid_p_triple(l, l1, l2):
+                    n += (2 * l + 1) * (2 * l1 + 1) if full else (l + 1) * (l1 + 1)
+    table = np.empty(n, dtype=np.float64)
+    cdef double[::1] t = table
+    n = 0
+    for l2 in range(1, l_max + 1):
+        for l1 in range(l2, l_max+1):
+            for l in range(l1, l_max+1):
+                if not valid_p_triple(l, l1, l2):
+                    continue
+                m_lo = -l if full else 0
+                m1_lo = -l1 if full else 0
+                for m in range(m_lo, l + 1):
+                    for m1 in range(m1_lo, l1 + 1):
+                        t[n] = clebsch(2*l1, 2*m1, 2* l2, 2*(m - m1), 2*l, 2*m)
+                        n += 1
+    table.setflags(write=False)
+    _CLEBSCH_TABLES[key] = table
+    return table
+
+
+cdef double complex invariant_P_c(const double complex[::1] coeffs, const double[::1] cg,
+                                  Py_ssize_t offset, int l, int l1, int l2) noexcept nogil:
     cdef double complex res = 0.0
     cdef double complex p, coeff
     cdef double c
@@ -160,7 +205,8 @@ cdef double complex invariant_P_c(double complex[::1] coeffs, int l, int l1, int
     for m in range(-l, l + 1):
         p = 0.0
         for m1 in range(-l1, l1 + 1):
-            c = clebsch(2*l1, 2*m1, 2* l2, 2*(m - m1), 2*l, 2*m)
+            c = cg[offset]
+            offset += 1
             if c == 0 or c != c:
                 continue
             idx1 = coefficient_c(l1, m1)
@@ -171,7 +217,8 @@ cdef double complex invariant_P_c(double complex[::1] coeffs, int l, int l1, int
         res += p * coeff.conjugate()
     return res
 
-cdef double complex invariant_P_r(double complex[::1] coeffs, int l, int l1, int l2) noexcept nogil:
+cdef double complex invariant_P_r(const double complex[::1] coeffs, const double[::1] cg,
+                                  Py_ssize_t offset, int l, int l1, int l2) noexcept nogil:
     cdef double complex res = 0.0
     cdef double complex p, coeff
     cdef double c
@@ -179,7 +226,8 @@ cdef double complex invariant_P_r(double complex[::1] coeffs, int l, int l1, int
     for m in range(0, l + 1):
         p = 0.0
         for m1 in range(0, l1 + 1):
-            c = clebsch(2*l1, 2*m1, 2* l2, 2*(m - m1), 2*l, 2*m)
+            c = cg[offset]
+            offset += 1
             if c == 0 or c != c:
                 continue
             idx1 = coefficient_r(l1, m1)
@@ -190,58 +238,74 @@ cdef double complex invariant_P_r(double complex[::1] coeffs, int l, int l1, int
         res += p * coeff.conjugate()
     return res
 
+cdef p_invariants_finish(values, odd, out):
+    R = np.real(values[~odd])
+    R = np.sign(R) * np.cbrt(R)
+    J = np.imag(values[odd])
+    J = np.sign(J) * np.cbrt(J)
+    if out is None:
+        return np.hstack([R, J])
+    out[:R.shape[0]] = R
+    out[R.shape[0]:] = J
+    return out
+
+
 # See Burel & Henocq, Sig Proc 1995 for details
-cpdef p_invariants_c(coeffs):
+cpdef p_invariants_c(coeffs, out=None):
     cdef int l_max = <int>(sqrt(len(coeffs))) - 1
     cdef int l, l1, l2
-    cdef double complex i
-    even_inv = []
-    odd_inv = []
-    for l2 in range(1, l_max + 1):
-        for l1 in range(l2, l_max+1):
-            for l in range(l1, l_max+1):
-                if (l1 - l2 > l) or (l1 + l2  < l):
-                    continue
-                if (((l % 2 == 0) or (l2 != l1)) and
-                        ((l2 % 2 == 0) or (l1 != l))):
-                    i = invariant_P_c(coeffs, l, l1, l2)
-                else:
-                    continue
-                if (l + l1 + l2) % 2 == 0:
-                    even_inv.append(i)
-                else:
-                    odd_inv.append(i)
-    R = np.real(even_inv)
-    R = np.sign(R) * np.cbrt(R)
-    J = np.imag(odd_inv)
-    J = np.sign(J) * np.cbrt(J)
-    return np.hstack([R, J])
+    cdef Py_ssize_t k = 0, offset = 0
+    cdef const double complex[::1] c = coeffs
+    cdef const double[::1] cg = clebsch_table(l_max, True)
+    values = np.empty(n_p_invariants(l_max), dtype=np.complex128)
+    odd = np.empty(values.shape[0], dtype=bool)
+    cdef double complex[::1] v = values
+    cdef cython.uchar[::1] is_odd = odd.view(np.uint8)
+    with nogil:
+        for l2 in range(1, l_max + 1):
+            for l1 in range(l2, l_max+1):
+                for l in range(l1, l_max+1):
+                    if not valid_p_triple(l, l1, l2):
+                        continue
+                    v[k] = invariant_P_c(c, cg, offset, l, l1, l2)
+                    is_odd[k] = (l + l1 + l2) % 2
+                    offset += (2 * l + 1) * (2 * l1 + 1)
+                    k += 1
+    return p_invariants_finish(values, odd, out)
 
-cpdef p_invariants_r(coeffs):
+cpdef p_invariants_r(coeffs, out=None):
     cdef int l_max = <int>((-3 + sqrt(8 * len(coeffs) + 1)) / 2)
     cdef int l, l1, l2
-    cdef double complex i
-    even_inv = []
-    odd_inv = []
+    cdef Py_ssize_t k = 0, offset = 0
+    cdef const double complex[::1] c = coeffs
+    cdef const double[::1] cg = clebsch_table(l_max, False)
+    values = np.empty(n_p_invariants(l_max), dtype=np.complex128)
+    odd = np.empty(values.shape[0], dtype=bool)
+    cdef double complex[::1] v = values
+    cdef cython.uchar[::1] is_odd = odd.view(np.uint8)
+    with nogil:
+        for l2 in range(1, l_max + 1):
+            for l1 in range(l2, l_max+1):
+                for l in range(l1, l_max+1):
+                    if not valid_p_triple(l, l1, l2):
+                        continue
+                    v[k] = invariant_P_r(c, cg, offset, l, l1, l2)
+                    is_odd[k] = (l + l1 + l2) % 2
+                    offset += (l + 1) * (l1 + 1)
+                    k += 1
+    return p_invariants_finish(values, odd, out)
+
+
+cpdef int n_p_invariants(int l_max):
+    "the number of P type invariants p_invariants_* will produce for l_max"
+    cdef int l, l1, l2
+    cdef int count = 0
     for l2 in range(1, l_max + 1):
         for l1 in range(l2, l_max+1):
             for l in range(l1, l_max+1):
-                if (l1 - l2 > l) or (l1 + l2  < l):
-                    continue
-                if (((l % 2 == 0) or (l2 != l1)) and
-                        ((l2 % 2 == 0) or (l1 != l))):
-                    i = invariant_P_r(coeffs, l, l1, l2)
-                else:
-                    continue
-                if (l + l1 + l2) % 2 == 0:
-                    even_inv.append(i)
-                else:
-                    odd_inv.append(i)
-    R = np.real(even_inv)
-    R = np.sign(R) * np.cbrt(R)
-    J = np.imag(odd_inv)
-    J = np.sign(J) * np.cbrt(J)
-    return np.hstack([R, J])
+                if valid_p_triple(l, l1, l2):
+                    count += 1
+    return count
 
 
 cpdef double clebsch_gordan(l1, m1, l2, m2, l, m):
@@ -228,6 +228,24 @@ def analysis_kernel_cplx(sht, w, coeffs):
 def analysis_kernel_real(sht, w, coeffs):
     analysis_cython_real(sht.lmax, sht.nphi, sht.fft_work_array, sht.plm_work_array, w, coeffs)
 
+def analysis_rows_cplx(sht, const double complex[:, ::1] fft_rows,
+                       const double[:, ::1] plm_rows, double complex[:] coeffs):
+    cdef int itheta
+    cdef int lmax = sht.lmax, nphi = sht.nphi
+    cdef const double[::1] weights = sht.weights
+    with nogil:
+        for itheta in range(fft_rows.shape[0]):
+            analysis_cython_cplx(lmax, nphi, fft_rows[itheta], plm_rows[itheta], weights[itheta], coeffs)
+
+def analysis_rows_real(sht, const double complex[:, ::1] fft_rows,
+                       const double[:, ::1] plm_rows, double complex[:] coeffs):
+    cdef int itheta
+    cdef int lmax = sht.lmax, nphi = sht.nphi
+    cdef const double[::1] weights = sht.weights
+    with nogil:
+        for itheta in range(fft_rows.shape[0]):
+            analysis_cython_real(lmax, nphi, fft_rows[itheta], plm_rows[itheta], weights[itheta], coeffs)
+
 def synthesis_kernel_cplx(sht, coeffs):
     synthesis_cython_cplx(sht.lmax, sht.nphi, coeffs, sht.plm_work_array, sht.fft_work_array)
 
@@ -1,37 +1,45 @@
-from chmpy import StockholderWeight, PromoleculeDensity
+from chmpy import Molecule, StockholderWeight, PromoleculeDensity
 from chmpy.shape._sht import expand_coeffs_to_full
 from chmpy.interpolate._density import (
     sphere_stockholder_radii,
     sphere_promolecule_radii,
 )
-from ._invariants import p_invariants_c, p_invariants_r
+from ._invariants import p_invariants_c, p_invariants_r, n_p_invariants
+from functools import lru_cache
 import logging
 import numpy as np
 
 LOG = logging.getLogger(__name__)
 _HAVE_WARNED_ABOUT_LMAX_P = False
+_STOCKHOLDER_BOUNDS = (0.1, 20.0)
+_PROMOLECULE_BOUNDS = (0.4, 20.0)
 
 
-def make_N_invariants(coefficients) -> np.ndarray:
+@lru_cache(maxsize=None)
+def _n_invariant_offsets(size):
+    "start of each block of 2l + 1 coefficients i.e. l^2 for l < size"
+    offsets = np.arange(size) ** 2
+    offsets.setflags(write=False)
+    return offsets
+
+
+def make_N_invariants(coefficients, out=None) -> np.ndarray:
     """
     Construct the `N` type invariants from SHT coefficients.
     If coefficients is of length n, the size of the result will be sqrt(n)
 
     Arguments:
         coefficients (np.ndarray): the set of spherical harmonic coefficients
+        out (np.ndarray, optional): destination array for the invariants
 
     Returns:
         np.ndarray the `N` type rotational invariants based on these coefficients
     """
     size = int(np.sqrt(len(coefficients)))
-    invariants = np.empty(shape=(size), dtype=np.float64)
-    for i in range(0, size):
-        lower, upper = i ** 2, (i + 1) ** 2
-        invariants[i] = np.sum(
-            coefficients[lower : upper + 1]
-            * np.conj(coefficients[lower : upper + 1])
-        ).real
-    return np.sqrt(invariants)
+    # sum |c_lm|^2 over each block of 2l + 1 coefficients
+    mag = (coefficients[: size * size] * np.conj(coefficients[: size * size])).real
+    invariants = np.add.reduceat(mag, _n_invariant_offsets(size), out=out)
+    return np.sqrt(invariants, out=invariants)
 
 
 def make_invariants(l_max, coefficients, kinds="NP") -> np.ndarray:
@@ -48,16 +56,14 @@ def make_invariants(l_max, coefficients, kinds="NP") -> np.ndarray:
     """
 
     global _HAVE_WARNED_ABOUT_LMAX_P
-    invariants = []
-    if "N" in kinds:
-        invariants.append(make_N_invariants(coefficients))
+    n_size = int(np.sqrt(len(coefficients))) if "N" in kinds else 0
+    p_size = 0
     if "P" in kinds:
         # Because we only have factorial precision (double precision)
         # in our clebsch implementation up to 70! l_max for P type
         # invariants is restricted to <= 23
         # TODO use a better clebsch gordan coefficients implementation
         # e.g. that in https://github.com/GXhelsinki/Clebsch-Gordan-Coefficients-
-        pfunc = p_invariants_c
         MAX_L_MAX = 23
         if l_max > MAX_L_MAX:
             if not _HAVE_WARNED_ABOUT_LMAX_P:
@@ -66,22 +72,38 @@ def make_invariants(l_max, coefficients, kinds="NP") -> np.ndarray:
                     "will only using N type invariants beyond that."
                 )
                 _HAVE_WARNED_ABOUT_LMAX_P = True
-            c = coefficients[: MAX_L_MAX * MAX_L_MAX]
-            invariants.append(pfunc(c))
+            p_coeffs = coefficients[: MAX_L_MAX * MAX_L_MAX]
         else:
-            invariants.append(pfunc(coefficients))
-    return np.hstack(invariants)
+            p_coeffs = coefficients
+        p_size = n_p_invariants(int(np.sqrt(len(p_coeffs))) - 1)
+
+    # write each kind straight into its slice of the result
+    invariants = np.empty(n_size + p_size, dtype=np.float64)
+    if "N" in kinds:
+        make_N_invariants(coefficients, out=invariants[:n_size])
+    if "P" in kinds:
+        p_invariants_c(p_coeffs, out=invariants[n_size:])
+    return invariants
+
+
+def _grid_directions_f32(sht):
+    "Contiguous (N, 3) float32 grid directions for `sht`, cached on the object"
+    g = getattr(sht, "_grid_directions_f32", None)
+    if g is None:
+        g = np.ascontiguousarray(
+            np.stack(sht.grid_cartesian, axis=-1).reshape(-1, 3), dtype=np.float32
+        )
+        sht._grid_directions_f32 = g
+    return g
 
 
 def _compute_property_in_j_channel(sht, r, property_function, origin=None):
-    x, y, z = sht.grid_cartesian
-    xyz = np.c_[x.flatten(), y.flatten(), z.flatten()] * r.flatten()[:, np.newaxis]
+    xyz = np.stack(sht.grid_cartesian, axis=-1).reshape(-1, 3)
+    xyz *= r.reshape(-1, 1)
     if origin is not None:
         xyz += origin
-    prop_values = property_function(xyz)
-    r_cplx = np.empty(r.shape, dtype=np.complex128)
-    r_cplx.real = r
-    r_cplx.imag = prop_values.reshape(r.shape)
+    r_cplx = r.astype(np.result_type(r.dtype, np.complex64))
+    r_cplx.imag = property_function(xyz).reshape(r.shape)
     return r_cplx
 
 def stockholder_weight_descriptor(sht, n_i, p_i, n_e, p_e, **kwargs):
@@ -110,22 +132,26 @@ def stockholder_weight_descriptor(sht, n_i, p_i, n_e, p_e, **kwargs):
         origin (np.ndarray): specify the center of the surface
             (default is the geometric centroid of the interior atoms)
         kinds (str): the kinds of invariants to calculate (default 'NP')
+        dtype (np.dtype): precision of the surface values passed to the SHT,
+            np.float32 halves the memory of the FFT step at the cost of
+            single precision coefficients (default np.float64)
     Returns:
         np.ndarray: the rotation invariant descriptors of the Hirshfeld surface shape
     """
+    l_max = sht.lmax
     isovalue = kwargs.get("isovalue", 0.5)
-    background = kwargs.get("background", 0.0)
     property_function = kwargs.get("with_property", None)
-    r_min, r_max = kwargs.get("bounds", (0.1, 20.0))
-    o = kwargs.get("origin", np.mean(p_i, axis=0, dtype=np.float32))
-    s = StockholderWeight.from_arrays(n_i, p_i, n_e, p_e, background=background)
-    g = np.empty((sht.grid[0].size, 3), dtype=np.float32)
-    x, y, z = sht.grid_cartesian
-    g[:, 0] = x.flatten()
-    g[:, 1] = y.flatten()
-    g[:, 2] = z.flatten()
-
-    r = sphere_stockholder_radii(s.s, o, g, r_min, r_max, 1e-7, 30, isovalue).reshape(sht.grid[0].shape)
+    r_min, r_max = kwargs.get("bounds", _STOCKHOLDER_BOUNDS)
+    o = kwargs.get("origin")
+    if o is None:
+        o = np.mean(p_i, axis=0, dtype=np.float32)
+    s = StockholderWeight.from_arrays(
+        n_i, p_i, n_e, p_e, background=kwargs.get("background", 0.0)
+    )
+    g = _grid_directions_f32(sht)
+
+    r = sphere_stockholder_radii(s.s, o, g, r_min, r_max, 1e-7, 30, isovalue)
+    r = r.astype(kwargs.get("dtype", np.float64), copy=False).reshape(sht.ntheta, sht.nphi)
     if np.any(r < 0):
         raise ValueError(
             f"Unable to find isovalue {isovalue:.2f} in all directions for bounds ({r_min:.2f}, {r_max:.2f})"
@@ -135,16 +161,11 @@ def stockholder_weight_descriptor(sht, n_i, p_i, n_e, p_e, **kwargs):
         if property_function == "d_norm":
             property_function = lambda x: s.d_norm(x)[3]
         elif property_function == "esp":
-            from chmpy import Molecule
-
-            els = s.dens_a.elements
-            pos = s.dens_a.positions
             property_function = Molecule.from_arrays(
                 s.dens_a.elements, s.dens_a.positions
             ).electrostatic_potential
         r = _compute_property_in_j_channel(sht, r, property_function, origin=o)
         real = False
-    l_max = sht.lmax
     coeffs = sht.analysis(r)
 
     coeff4inv = expand_coeffs_to_full(l_max, coeffs) if real else coeffs
@@ -177,21 +198,24 @@ def promolecule_density_descriptor(sht, n_i, p_i, **kwargs):
         origin (np.ndarray): specify the center of the surface
             (default is the geometric centroid of the atoms)
         kinds (str): the kinds of invariants to calculate (default 'NP')
+        dtype (np.dtype): precision of the surface values passed to the SHT,
+            np.float32 halves the memory of the FFT step at the cost of
+            single precision coefficients (default np.float64)
     Returns:
         np.ndarray: the rotation invariant descriptors of the promolecule surface shape
     """
+    l_max = sht.lmax
     isovalue = kwargs.get("isovalue", 0.0002)
     property_function = kwargs.get("with_property", None)
-    r_min, r_max = kwargs.get("bounds", (0.4, 20.0))
+    r_min, r_max = kwargs.get("bounds", _PROMOLECULE_BOUNDS)
     pro = PromoleculeDensity((n_i, p_i))
-    g = np.empty((sht.grid[0].size, 3), dtype=np.float32)
-    x, y, z = sht.grid_cartesian
-    g[:, 0] = x.flatten()
-    g[:, 1] = y.flatten()
-    g[:, 2] = z.flatten()
-
-    o = kwargs.get("origin", np.mean(p_i, axis=0, dtype=np.float32))
-    r = sphere_promolecule_radii(pro.dens, o, g, r_min, r_max, 1e-12, 30, isovalue).reshape(sht.grid[0].shape)
+    g = _grid_directions_f32(sht)
+
+    o = kwargs.get("origin")
+    if o is None:
+        o = np.mean(p_i, axis=0, dtype=np.float32)
+    r = sphere_promolecule_radii(pro.dens, o, g, r_min, r_max, 1e-12, 30, isovalue)
+    r = r.astype(kwargs.get("dtype", np.float64), copy=False).reshape(sht.ntheta, sht.nphi)
     if np.any(r < 0):
         raise ValueError(
             f"Unable to find isovalue {isovalue:.2f} in all directions for bounds ({r_min:.2f}, {r_max:.2f})"
@@ -201,14 +225,11 @@ def promolecule_density_descriptor(sht, n_i, p_i, **kwargs):
         if property_function == "d_norm":
             property_function = lambda x: pro.d_norm(x)[1]
         elif property_function == "esp":
-            from chmpy import Molecule
-
-            els = pro.elements
-            pos = pro.positions
-            property_function = Molecule.from_arrays(els, pos).electrostatic_potential
-        r = _compute_property_in_j_channel(sht, r, property_function)
+            property_function = Molecule.from_arrays(
+                pro.elements, pro.positions
+            ).electrostatic_potential
+        r = _compute_property_in_j_channel(sht, r, property_function, origin=o)
         real = False
-    l_max = sht.lmax
     coeffs = sht.analysis(r)
     coeff4inv = expand_coeffs_to_full(l_max, coeffs) if real else coeffs
     invariants = make_invariants(
@@ -218,3 +239,32 @@ def promolecule_density_descriptor(sht, n_i, p_i, **kwargs):
     if kwargs.get("coefficients", False):
         return coeffs, invariants
     return invariants
+
+
+def batch_promolecule_density_descriptor(sht, elements, positions, nthreads=1, **kwargs):
+    """
+    Calculate promolecule density shape descriptors for several sets of atoms,
+    sharing the same SHT.
+
+    The root finding, SHT analysis and invariant evaluation release the GIL,
+    so the descriptors can be evaluated concurrently with threads.
+
+    Args:
+        sht (SHT): the spherical harmonic transform object handle
+        elements (List[np.ndarray]): atomic numbers of the atoms in each set
+        positions (List[np.ndarray]): Cartesian coordinates of the atoms in each set
+        nthreads (int, optional): number of threads to use (default 1)
+        **kwargs: keyword arguments passed to `promolecule_density_descriptor`
+
+    Returns:
+        List: the result of `promolecule_density_descriptor` for each set of atoms
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(nthreads) as e:
+        return list(
+            e.map(
+                lambda x: promolecule_density_descriptor(sht, *x, **kwargs),
+                zip(elements, positions),
+            )
+        )
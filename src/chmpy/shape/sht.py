@@ -2,6 +2,7 @@ import numpy as np
 from chmpy.util.num import spherical_to_cartesian_mgrid
 from ._sht import (
     AssocLegendre, analysis_kernel_real, analysis_kernel_cplx,
+    analysis_rows_real, analysis_rows_cplx,
     synthesis_kernel_real, synthesis_kernel_cplx,
     expand_coeffs_to_full
 )
@@ -59,6 +60,7 @@ class SHT:
         theta: the theta angular grid points (derived from cos_theta)
         fft_work_array: an internal work array for the various FFTs done in the transform
         plm_work_array: an internal work array for the evaluate of plm values
+        plm_table: the plm values at each theta grid point, one row per theta
 
     """
 
@@ -87,6 +89,7 @@ class SHT:
 
         self.fft_work_array = np.empty(self.nphi, dtype=np.complex128)
         self.plm_work_array = np.empty(self.nplm())
+        self._plm_table = None
         self._grid = None
         self._grid_cartesian = None
 
@@ -299,19 +302,35 @@ class SHT:
 
         real = not np.iscomplexobj(values)
         if real:
-            kernel = analysis_kernel_real
+            kernel = analysis_rows_real
             coeffs = np.zeros(self.nplm(), dtype=np.complex128)
         else:
-            kernel = analysis_kernel_cplx
+            kernel = analysis_rows_cplx
             coeffs = np.zeros(self.nlm(), dtype=np.complex128)
-        for itheta, (ct, w) in enumerate(zip(self.cos_theta, self.weights)):
-            self.fft_work_array[:] = values[itheta, :]
-
-            fft(self.fft_work_array, norm="forward", overwrite_x=True) 
-            self.plm.evaluate_batch(ct, result=self.plm_work_array)
-            kernel(self, w, coeffs)
+        # phi varies along the contiguous axis of the (ntheta, nphi) grid,
+        # so all the rows can be transformed in one batched FFT
+        fft_rows = fft(
+            np.asarray(values).reshape(self.ntheta, self.nphi),
+            axis=1, norm="forward"
+        )
+        # single precision input gives a single precision FFT, the
+        # Legendre step always accumulates in double precision
+        kernel(
+            self, np.ascontiguousarray(fft_rows, dtype=np.complex128),
+            self.plm_table, coeffs
+        )
         return coeffs
 
+    @property
+    def plm_table(self):
+        "Associated Legendre polynomial values at each theta grid point (ntheta, nplm)"
+        if self._plm_table is None:
+            table = np.empty((self.ntheta, self.nplm()))
+            for itheta, ct in enumerate(self.cos_theta):
+                self.plm.evaluate_batch(ct, result=table[itheta])
+            self._plm_table = table
+        return self._plm_table
+
     def synthesis(self, coeffs):
         """
         Perform the inverse SHT i.e. evaluate the given function at the
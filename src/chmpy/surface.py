@@ -20,6 +20,20 @@ def smooth_laplacian(vertices, faces, **kwargs):
     return mesh.vertices, mesh.faces
 
 
+def _grid_points(lower, upper, sep):
+    """Regular float32 grid points spanning [lower, upper), ordered as
+    `np.meshgrid` (y, x, z) would order them, along with the grid shape."""
+    x_grid = np.arange(lower[0], upper[0], sep, dtype=np.float32)
+    y_grid = np.arange(lower[1], upper[1], sep, dtype=np.float32)
+    z_grid = np.arange(lower[2], upper[2], sep, dtype=np.float32)
+    shape = (len(y_grid), len(x_grid), len(z_grid))
+    pts = np.empty(shape + (3,), dtype=np.float32)
+    pts[..., 0] = x_grid[np.newaxis, :, np.newaxis]
+    pts[..., 1] = y_grid[:, np.newaxis, np.newaxis]
+    pts[..., 2] = z_grid[np.newaxis, np.newaxis, :]
+    return pts.reshape(-1, 3), shape
+
+
 def promolecule_density_isosurface(
     promol, isovalue=0.002, sep=0.2, props=True, extra_props=None, smoothing="laplacian"
 ):
@@ -40,13 +54,8 @@ def promolecule_density_isosurface(
     """
     t1 = time.time()
     l, u = promol.bb()
-    x_grid = np.arange(l[0], u[0], sep, dtype=np.float32)
-    y_grid = np.arange(l[1], u[1], sep, dtype=np.float32)
-    z_grid = np.arange(l[2], u[2], sep, dtype=np.float32)
-    x, y, z = np.meshgrid(x_grid, y_grid, z_grid)
+    pts, shape = _grid_points(l, u, sep)
     separations = np.array((sep, sep, sep))
-    shape = x.shape
-    pts = np.c_[x.ravel(), y.ravel(), z.ravel()]
     d = promol.rho(pts).reshape(shape)
     verts, faces, normals, _ = marching_cubes(
         d, isovalue, spacing=(sep, sep, sep), gradient_direction="descent"
@@ -96,14 +105,8 @@ def stockholder_weight_isosurface(
     """
     t1 = time.time()
     l, u = s.bb()
-    x_grid = np.arange(l[0], u[0], sep, dtype=np.float32)
-    y_grid = np.arange(l[1], u[1], sep, dtype=np.float32)
-    z_grid = np.arange(l[2], u[2], sep, dtype=np.float32)
-    x, y, z = np.meshgrid(x_grid, y_grid, z_grid)
+    pts, shape = _grid_points(l, u, sep)
     separations = np.array((sep, sep, sep))
-    shape = x.shape
-    pts = np.c_[x.ravel(), y.ravel(), z.ravel()]
-    pts = np.array(pts, dtype=np.float32)
     weights = s.weights(pts).reshape(shape)
     verts, faces, normals, _ = marching_cubes(
         weights, isovalue, spacing=separations, gradient_direction="descent"
@@ -34,7 +34,9 @@ def load_template(name):
     result = _ALL_TEMPLATES.get(name)
     if result is None:
         try:
-            return CHMPY_TEMPLATE_ENV.get_template(name)
+            # store the compiled template so later lookups skip the loader
+            result = CHMPY_TEMPLATE_ENV.get_template(name)
+            _ALL_TEMPLATES[name] = result
         except Exception as e:
             LOG.error("Could not find template: %s (%s)", name, e)
     return result
@@ -5,6 +5,7 @@ from os.path import join, dirname
 from tempfile import TemporaryDirectory
 from chmpy.core.element import (
     Element,
+    atomic_masses,
     vdw_radii,
     chemical_formula,
     cov_radii,
@@ -20,6 +21,7 @@ class ElementTestCase(unittest.TestCase):
             self.assertEqual(e.atomic_number, 1)
             self.assertEqual(e.symbol, "H")
             self.assertEqual(e.name, "hydrogen")
+            self.assertIs(e, Element[1])
 
         for s in ("blah", "32.141", None, 1.5):
             with self.assertRaises(ValueError):
@@ -60,11 +62,12 @@ class ElementTestCase(unittest.TestCase):
         nums_invalid = np.array([-1, 105])
         np.testing.assert_allclose(cov_radii(nums_valid), [0.23, 1.5, 1.28])
         np.testing.assert_allclose(vdw_radii(nums_valid), [1.09, 1.4, 1.82])
+        np.testing.assert_allclose(atomic_masses(nums_valid), [1.00794, 4.002602, 6.941])
         np.testing.assert_equal(element_symbols(nums_valid), ["H", "He", "Li"])
         np.testing.assert_equal(
             element_names(nums_valid), ["hydrogen", "helium", "lithium"]
         )
 
-        for m in (cov_radii, vdw_radii, element_symbols, element_names):
+        for m in (cov_radii, vdw_radii, atomic_masses, element_symbols, element_names):
             with self.assertRaises(ValueError):
                 x = m(nums_invalid)
@@ -149,6 +149,16 @@ class CrystalTestCase(unittest.TestCase):
             self.ice_ii.to_fractional(self.ice_ii.to_cartesian(pos)), pos, atol=1e-8
         )
 
+    def test_cart_asymmetric_unit(self):
+        x = self.ice_ii
+        pos = x.asymmetric_unit.positions
+        np.testing.assert_allclose(x.cart_asymmetric_unit, x.to_cartesian(pos))
+        for length in (5.0, 6.0):
+            x.unit_cell = UnitCell.cubic(length)
+        np.testing.assert_allclose(x.cart_asymmetric_unit, 6.0 * pos)
+        x.unit_cell.set_lengths_and_angles([7.0] * 3, [np.pi / 2] * 3)
+        np.testing.assert_allclose(x.cart_asymmetric_unit, 7.0 * pos, atol=1e-12)
+
     def test_unit_cell_atoms(self):
         atom_calc = self.ice_ii.unit_cell_atoms()
         atoms = self.ice_ii.unit_cell_atoms()
@@ -187,6 +197,10 @@ class CrystalTestCase(unittest.TestCase):
             m1 = x.symmetry_unique_molecules()
             m2 = x.symmetry_unique_molecules()
             self.assertEqual(m1, m2)
+            s1 = x.slab(bounds=((-1, 0, 0), (1, 1, 0)))
+            s2 = x.slab(bounds=((-1, 0, 0), (1, 1, 0)))
+            self.assertIs(s1["cart_pos"], s2["cart_pos"])
+            self.assertEqual(s1["n_cells"], 6)
 
     def test_environments_functions(self):
         for c in ("ice_ii", "acetic", "r3c_example"):
@@ -196,6 +210,27 @@ class CrystalTestCase(unittest.TestCase):
             atoms = x.atom_group_surroundings([0, 1, 2])
             environments = x.molecule_environments()
 
+    def test_molecule_environments_consistent(self):
+        from scipy.spatial.distance import cdist
+
+        x = Crystal.load(TEST_FILES["iceII.cif"])
+        slab = x.slab(bounds=((-4, -4, -4), (4, 4, 4)))
+        for mol, elements, positions in x.molecule_environments():
+            _, el, pos = x.molecule_environment(mol)
+            np.testing.assert_array_equal(np.sort(el), np.sort(elements))
+            self.assertEqual(len(pos), len(positions))
+            d = cdist(mol.positions, slab["cart_pos"]).min(axis=0)
+            self.assertEqual(len(pos), np.sum((d > 1e-3) & (d < 6.0)))
+
+    def test_void_surface(self):
+        from chmpy import PromoleculeDensity
+
+        mesh = self.acetic.void_surface(separation=0.3, isovalue=0.002)
+        atoms = self.acetic.slab(bounds=((-1, -1, -1), (1, 1, 1)))
+        density = PromoleculeDensity((atoms["element"], atoms["cart_pos"]))
+        rho = density.rho(mesh.vertices.astype(np.float32))
+        np.testing.assert_allclose(rho, 0.002, atol=5e-4)
+
     def test_cartesian_symmetry_operations(self):
         for c in ("ice_ii", "acetic", "r3c_example"):
             x = getattr(self, c)
@@ -96,6 +96,14 @@ class SpaceGroupTestCase(unittest.TestCase):
 
         sg_148_h = SpaceGroup(148, choice="H")
         sg_148_r = SpaceGroup(148, choice="R")
+        self.assertEqual(
+            SpaceGroup(148, choice="R").symmetry_operations,
+            sg_148_r.symmetry_operations,
+        )
+        self.assertIsNot(
+            SpaceGroup(148, choice="R").symmetry_operations,
+            sg_148_r.symmetry_operations,
+        )
         for invalid_latt in (-8, 10, -4):
             with self.assertRaises(ValueError):
                 sg = SpaceGroup.from_symmetry_operations(
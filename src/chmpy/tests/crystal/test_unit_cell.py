@@ -21,11 +21,29 @@ class UnitCellTestCase(unittest.TestCase):
             c.to_fractional(np.eye(3)), 0.5 * np.eye(3), atol=1e-8
         )
         np.testing.assert_allclose(c.to_cartesian(np.eye(3)), 2 * np.eye(3), atol=1e-8)
+        out = np.empty((3, 3))
+        res = c.to_fractional(np.eye(3), out=out)
+        self.assertIs(res, out)
+        np.testing.assert_allclose(out, 0.5 * np.eye(3), atol=1e-8)
 
     def test_handle_bad_angles(self):
         # should warn
         c = UnitCell.from_lengths_and_angles([2.0] * 3, [90] * 3)
 
+    def test_from_lengths_and_angles_batched(self):
+        lengths = [[2.0, 2.0, 2.0], [3.0, 3.0, 5.0], [3.0, 4.0, 5.0]]
+        angles = [[90, 90, 90], [90, 90, 120], [45, 75, 90]]
+        cells = UnitCell.from_lengths_and_angles_batched(
+            lengths, angles, unit="degrees"
+        )
+        self.assertEqual(len(cells), 3)
+        for c, l, a in zip(cells, lengths, angles):
+            expected = UnitCell.from_lengths_and_angles(l, a, unit="degrees")
+            self.assertEqual(c.cell_type, expected.cell_type)
+            np.testing.assert_allclose(c.direct, expected.direct, atol=1e-12)
+            np.testing.assert_allclose(c.inverse, expected.inverse, atol=1e-12)
+            np.testing.assert_allclose(c.parameters, expected.parameters)
+
     def test_repr(self):
         c = UnitCell.cubic(2.0)
         self.assertTrue(str(c) == "<UnitCell: cubic (2.000)>")
@@ -5,6 +5,36 @@ from chmpy import PromoleculeDensity, StockholderWeight
 from .. import TEST_FILES
 
 
+class LerpTestCase(unittest.TestCase):
+    def test_vectorized_lerp(self):
+        from chmpy.interpolate.lerp import vectorized_lerp
+
+        xp = np.array((0.0, 0.5, 2.0, 3.0))
+        yp = np.array((1.0, 2.0, 0.0, 4.0))
+        xs = np.linspace(-1.0, 4.0, 21)
+        result = vectorized_lerp(xs, xp, yp, l_fill=-1.0, u_fill=-2.0)
+        expected = np.interp(xs, xp, yp, left=-1.0, right=-2.0)
+        np.testing.assert_allclose(result, expected)
+
+        xp = np.linspace(0.0, 3.0, 7)
+        yp = np.sin(xp)
+        result = vectorized_lerp(xs, xp, yp)
+        np.testing.assert_allclose(result, np.interp(xs, xp, yp))
+
+        # tiny and nearly uniform spacings must not take the uniform path
+        xp = np.array((0.0, 1e-9, 5e-9, 6e-9))
+        yp = np.array((0.0, 1.0, 0.0, 1.0))
+        xs = np.array((3e-9,))
+        np.testing.assert_allclose(vectorized_lerp(xs, xp, yp), [0.5])
+
+        xp = np.array((0.0, 1.0, 2.0, 3.00001, 4.0))
+        yp = np.array((0.0, 1.0, 0.0, 1.0, 0.0))
+        xs = np.array((3.000005,))
+        np.testing.assert_allclose(
+            vectorized_lerp(xs, xp, yp), np.interp(xs, xp, yp)
+        )
+
+
 class PromoleculeDensityTestCase(unittest.TestCase):
     pos = np.array([(0.0, 0.0, 0.0), (1.0, 0.0, 0.0)])
     els = np.ones(2, dtype=int)
@@ -38,16 +68,44 @@ class PromoleculeDensityTestCase(unittest.TestCase):
             "<PromoleculeDensity: 2 atoms, centre=(0.5, 0.0, 0.0)>",
         )
 
+    def test_sphere_radii_batch(self):
+        from chmpy.interpolate._density import (
+            sphere_promolecule_radii,
+            sphere_promolecule_radii_batch,
+        )
+
+        grid = np.eye(3, dtype=np.float32)
+        origins = np.array(((0.0, 0.0, 0.0), (0.5, 0.0, 0.0)), dtype=np.float32)
+        r = sphere_promolecule_radii_batch(
+            self.dens.dens, origins, grid, 0.1, 20.0, 1e-7, 30, 0.002
+        )
+        self.assertEqual(r.shape, (2, 3))
+        for o, expected in zip(origins, r):
+            single = sphere_promolecule_radii(
+                self.dens.dens, o, grid, 0.1, 20.0, 1e-7, 30, 0.002
+            )
+            np.testing.assert_allclose(single, expected)
+
     def test_d_norm(self):
         pts = np.array(self.pos) + (1.0, 0.0, 0.0)
         d, d_norm, vecs = self.dens.d_norm(pts)
         expected = np.array((-1.0, -0.082569))
         expected_d = np.array((0.0, 1.0))
-        expected_vecs = np.array(((-0.917431, 0, 0), (-1.834862, 0, 0)))
+        # both points are nearest the second atom
+        expected_vecs = np.array(((0.0, 0, 0), (-0.917431, 0, 0)))
         np.testing.assert_allclose(d_norm, expected, atol=1e-5)
         np.testing.assert_allclose(d, expected_d, atol=1e-5)
         np.testing.assert_allclose(vecs, expected_vecs, atol=1e-5)
 
+    def test_d_norm_vecs(self):
+        pos = np.array(((0.0, 0.0, 0.0), (3.0, 0.0, 0.0), (0.0, 3.0, 0.0)))
+        dens = PromoleculeDensity((np.array((1, 8, 1)), pos))
+        pts = np.array(((3.0, 0.5, 0.0), (0.5, 2.5, 0.0), (-0.5, 0.0, 0.0)))
+        d, d_norm, vecs = dens.d_norm(pts)
+        vdw = dens.vdw_radii[[1, 2, 0]]
+        expected_vecs = (pos[[1, 2, 0]] - pts) / vdw[:, np.newaxis]
+        np.testing.assert_allclose(vecs, expected_vecs)
+
     def test_from_xyz_file(self):
         dens = PromoleculeDensity.from_xyz_file(TEST_FILES["water.xyz"])
 
@@ -23,6 +23,27 @@ class SurfaceTestCase(unittest.TestCase):
             separation=1.0, radius=3.8, kind="atom"
         )
 
+    def test_threaded_surfaces(self):
+        ice = Crystal.load(TEST_FILES["iceII.cif"])
+        kwargs = dict(separation=1.0, radius=3.8, color="fragment_patch")
+        serial = ice.stockholder_weight_isosurfaces(nthreads=1, **kwargs)
+        threaded = ice.stockholder_weight_isosurfaces(nthreads=2, **kwargs)
+        self.assertEqual(len(serial), len(threaded))
+        # each surface's properties must come from its own molecule
+        from scipy.spatial import cKDTree
+
+        for a, (mol, _, _) in zip(serial, ice.molecule_environments(radius=3.8)):
+            _, idx = cKDTree(mol.positions).query(a.vertices)
+            np.testing.assert_array_equal(
+                a.vertex_attributes["nearest_atom_internal"], mol.atomic_numbers[idx]
+            )
+        for a, b in zip(serial, threaded):
+            np.testing.assert_allclose(a.vertices, b.vertices)
+            for k in ("nearest_atom_internal", "nearest_atom_external"):
+                np.testing.assert_array_equal(
+                    a.vertex_attributes[k], b.vertex_attributes[k]
+                )
+
     def test_save(self):
         with TemporaryDirectory() as tmpdirname:
             surfaces = self.acetic_acid.promolecule_density_isosurfaces(separation=1.0)
@@ -19,16 +19,83 @@ class ShapeDescriptorTestCase(unittest.TestCase):
         desc = self.acetic.molecular_shape_descriptors(l_max=3, radius=3.8)
         self.assertEqual(desc.shape, (1, 8))
 
+    def test_threaded_descriptors(self):
+        for method in ("atomic_shape_descriptors", "molecular_shape_descriptors"):
+            f = getattr(self.acetic, method)
+            serial = f(l_max=3, radius=3.8, nthreads=1)
+            threaded = f(l_max=3, radius=3.8, nthreads=2)
+            np.testing.assert_allclose(threaded, serial)
+
+    def test_single_precision_descriptors(self):
+        from chmpy.shape import (
+            SHT,
+            promolecule_density_descriptor,
+            stockholder_weight_descriptor,
+        )
+
+        sht = SHT(5)
+        mol, n_e, p_e = self.acetic.molecule_environments(radius=3.8)[0]
+        n_i, p_i = mol.atomic_numbers, mol.positions
+        o = np.array(mol.centroid, dtype=np.float32)
+        kwargs = dict(origin=o, bounds=(0.1, 10.0))
+        for with_property in (None, "d_norm"):
+            expected = stockholder_weight_descriptor(
+                sht, n_i, p_i, n_e, p_e, with_property=with_property, **kwargs
+            )
+            desc = stockholder_weight_descriptor(
+                sht,
+                n_i,
+                p_i,
+                n_e,
+                p_e,
+                with_property=with_property,
+                dtype=np.float32,
+                **kwargs,
+            )
+            # single precision radii, so agreement to ~1e-5 relative
+            np.testing.assert_allclose(desc, expected, rtol=1e-4, atol=1e-5)
+        expected = promolecule_density_descriptor(sht, n_i, p_i, origin=o)
+        desc = promolecule_density_descriptor(
+            sht, n_i, p_i, origin=o, dtype=np.float32
+        )
+        np.testing.assert_allclose(desc, expected, rtol=1e-4, atol=1e-5)
+
     def test_atom_group_shape_descriptors(self):
         desc = self.acetic.atom_group_shape_descriptors([0, 1, 2], l_max=3, radius=3.8)
         self.assertEqual(desc.shape, (8,))
 
+    def test_batch_promolecule_descriptors(self):
+        from chmpy.shape import (
+            SHT,
+            batch_promolecule_density_descriptor,
+            promolecule_density_descriptor,
+        )
+
+        sht = SHT(3)
+        mols = self.acetic.unit_cell_molecules()
+        desc = batch_promolecule_density_descriptor(
+            sht,
+            [m.atomic_numbers for m in mols],
+            [m.positions for m in mols],
+            nthreads=2,
+        )
+        self.assertEqual(len(desc), len(mols))
+        expected = promolecule_density_descriptor(
+            sht, mols[0].atomic_numbers, mols[0].positions
+        )
+        np.testing.assert_allclose(desc[0], expected)
+
     def test_invariants(self):
         from chmpy.shape.shape_descriptors import make_N_invariants, make_invariants
 
         coeffs = np.random.rand(16).astype(np.complex128)
         inv = make_N_invariants(coeffs)
         self.assertEqual(len(inv), 4)
+        expected = [
+            np.sqrt(np.sum(np.abs(coeffs[l * l : (l + 1) * (l + 1)]) ** 2))
+            for l in range(4)
+        ]
+        np.testing.assert_allclose(inv, expected)
 
         coeffs = np.random.rand(26 * 26).astype(np.complex128)
         inv = make_invariants(25, coeffs)
@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 # TODO add LinearSegmentedColormap objects for other
 # CrystalExplorer default colors
 DEFAULT_COLORMAPS = {
@@ -11,6 +13,34 @@ DEFAULT_COLORMAPS = {
 }
 
 
+@lru_cache(maxsize=None)
+def _named_colormap(name):
+    try:
+        from matplotlib import colormaps
+    except ImportError:
+        from matplotlib.cm import get_cmap
+
+        return get_cmap(name)
+    return colormaps[name]
+
+
+def get_colormap(cmap):
+    """
+    Look up a matplotlib colormap by name, importing matplotlib and
+    resolving each name only once.
+
+    Args:
+        cmap (str or Colormap): the color map name, or a Colormap which
+            is returned as is
+
+    Returns:
+        Colormap: the matplotlib colormap
+    """
+    if isinstance(cmap, str):
+        return _named_colormap(cmap)
+    return cmap
+
+
 def property_to_color(prop, cmap="viridis", **kwargs):
     """
     Convert a scalar array of property values to colors,
@@ -26,25 +56,46 @@ def property_to_color(prop, cmap="viridis", **kwargs):
     Returns:
         array_like: the array of color values for the given property
     """
-    from matplotlib.cm import get_cmap
-
-    colormap = get_cmap(kwargs.get("colormap", DEFAULT_COLORMAPS.get(cmap, cmap)))
+    colormap = get_colormap(
+        kwargs.get("colormap", DEFAULT_COLORMAPS.get(cmap, cmap))
+    )
     norm = None
     vmin = kwargs.get("vmin", prop.min())
     vmax = kwargs.get("vmax", prop.max())
     midpoint = kwargs.get("midpoint", max(min(0.0, vmax - 0.01), vmin + 0.01) if cmap in ("d_norm", "esp") else None)
     if midpoint is not None:
-        try:
-            from matplotlib.colors import TwoSlopeNorm
-        except ImportError:
-            from matplotlib.colors import DivergingNorm as TwoSlopeNorm
         assert vmin <= midpoint, f"vmin={vmin} midpoint={midpoint}"
         assert vmax >= midpoint, f"vmin={vmax} midpoint={midpoint}"
-        norm = TwoSlopeNorm(vmin=vmin, vcenter=midpoint, vmax=vmax)
-        prop = norm(prop)
-        return colormap(prop)
+        return colormap(two_slope_normalize(prop, vmin, midpoint, vmax))
     else:
         import numpy as np
 
         prop = np.clip(prop, vmin, vmax) - vmin
         return colormap(prop)
+
+
+def two_slope_normalize(prop, vmin, vcenter, vmax):
+    """
+    Map property values to [0, 1] with a different linear scale either
+    side of `vcenter`, as matplotlib's `TwoSlopeNorm` does, i.e.
+    `vmin -> 0`, `vcenter -> 0.5` and `vmax -> 1`.
+
+    Args:
+        prop (array_like): the scalar array of property values
+        vmin (float): the property value mapped to 0
+        vcenter (float): the property value mapped to 0.5
+        vmax (float): the property value mapped to 1
+
+    Returns:
+        np.ndarray: the normalized values as a new float32 array
+    """
+    import numpy as np
+
+    result = np.subtract(prop, vcenter, dtype=np.float32)
+    lower = result < 0
+    if vcenter > vmin:
+        np.multiply(result, 0.5 / (vcenter - vmin), out=result, where=lower)
+    if vmax > vcenter:
+        np.multiply(result, 0.5 / (vmax - vcenter), out=result, where=~lower)
+    result += 0.5
+    return result